@@ -2,6 +2,7 @@
 import os
 import re
 import sys
+import argparse
 import concurrent.futures
 from urllib.parse import urlparse, urljoin, unquote
 from collections import defaultdict, Counter
@@ -10,7 +11,7 @@ import time
 
 # Try to import required libraries
 try:
-    from bs4 import BeautifulSoup
+    from parsing import parse_html, set_parser, PARSER_PREFERENCE
     import requests
     from colorama import init, Fore, Style
 except ImportError as e:
@@ -88,7 +89,7 @@ class SEOAudit:
         if os.path.exists(index_path):
             try:
                 with open(index_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    soup = BeautifulSoup(f, 'html.parser')
+                    soup = parse_html(f)
                     
                     # Base URL
                     canonical = soup.find('link', rel='canonical')
@@ -156,7 +157,7 @@ class SEOAudit:
         try:
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
-                soup = BeautifulSoup(content, 'html.parser')
+                soup = parse_html(content)
                 
                 # C. Semantics
                 # H1 Check
@@ -403,5 +404,9 @@ class SEOAudit:
             print("- Consider running a fix script if available.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SEO audit of the built site.")
+    parser.add_argument('--parser', choices=PARSER_PREFERENCE, help="HTML parser backend (default: fastest installed)")
+    args = parser.parse_args()
+    if args.parser: set_parser(args.parser)
     audit = SEOAudit()
     audit.run()
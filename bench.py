@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""Build benchmark on a synthetic corpus.
+
+Generates N posts shaped like the real ones (JSON-LD BlogPosting, <main><article>,
+<time itemprop="datePublished">) next to a copy of the site and its builder in a
+temp directory, then runs three builds there:
+
+- cold: --full on the fresh corpus
+- noop: the same build again with nothing changed
+- edit: one post edited
+
+Each build is a build.py subprocess: wall time and peak RSS come from the
+process itself, output size from the deployable tree after the build. With
+--phases the builds run with --profile, which adds per-phase time and peak
+traced memory at the cost of tracemalloc's overhead, so only compare --phases
+results with other --phases results.
+
+Post i is the same for every corpus size and depends only on --seed, so
+results from different commits (see --ref) compare directly. --compare prints
+the change against an earlier results file.
+
+    python bench.py                           # 100, 1k, 10k and 50k posts
+    python bench.py --sizes 100,1000 --jobs 4 --phases
+    python bench.py --ref HEAD~1 --output before.json
+    python bench.py --sizes 100,1000 --compare before.json
+"""
+import os
+import io
+import sys
+import json
+import time
+import random
+import shutil
+import tarfile
+import platform
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+from html import escape
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+SIZES = (100, 1000, 10000, 50000)
+RESULTS_DIR = os.path.join(ROOT_DIR, '.build', 'bench')
+# Never copied into the benchmark site; everything build.py generates is removed after copying.
+COPY_IGNORE = shutil.ignore_patterns('.git', '.build', '__pycache__', 'node_modules', 'MasterTool', 'dist')
+GENERATED = ['assets', 'blog/data', 'blog/page', 'blog/category', 'sitemap.xml', 'sitemap.xml.gz', 'sw.js', '_headers']
+# Not part of the deployed site.
+SOURCE_EXTENSIONS = ('.py', '.md', '.tmp')
+SOURCE_DIRS = {'.build', '.git', '__pycache__', 'node_modules', 'MasterTool', 'fonts'}
+EPOCH = date(2026, 1, 1)
+
+# (filename stem, title) pairs; the stems hit every filename rule in styles.json.
+TOPICS = [
+    ('what-is-claude-feature', "Claude{n}号功能是什么？全面解析"),
+    ('how-to-use-claude', "如何用Claude完成第{n}类任务：新手教程"),
+    ('claude-vs-chatgpt', "Claude vs ChatGPT 第{n}轮对比评测"),
+    ('buy-claude-pro', "Claude Pro 购买指南（方案{n}）"),
+    ('register-claude', "Claude注册教程：第{n}种方法"),
+    ('claude-usage-limits', "Claude使用限制与封号风险（{n}）"),
+    ('claude-code-guide', "Claude Code 编程实战第{n}篇"),
+    ('claude-opus-review', "Claude Opus 深度体验 #{n}"),
+    ('academic-writing-claude', "用Claude写论文：学术科研技巧{n}"),
+    ('claude-news', "Claude 本周资讯第{n}期"),
+]
+HEADINGS = ["核心功能", "使用步骤", "常见问题", "优缺点分析", "适用场景", "进阶技巧", "注意事项", "总结"]
+SENTENCES = [
+    "Claude 是 Anthropic 推出的人工智能助手，擅长长文本理解和复杂推理。",
+    "在编程场景中，Claude 可以阅读整个代码库并给出修改建议。",
+    "很多用户第一次使用时会关心账号注册和网络环境的问题。",
+    "与 ChatGPT 相比，Claude 在写作风格上更加克制，也更少出现幻觉。",
+    "Pro 订阅提供更高的使用额度，适合每天重度使用的用户。",
+    "上传 PDF 或表格之后，可以直接让它总结要点并生成报告。",
+    "Artifacts 功能让生成的网页、图表和文档可以实时预览。",
+    "如果遇到使用限制，可以等待额度重置或者切换到其他模型。",
+    "Projects 可以保存长期上下文，让团队共享同一套知识库。",
+    "MCP 协议让 Claude 能够连接本地文件、数据库和第三方服务。",
+    "对于学术写作，建议先让它列出大纲，再逐段润色。",
+    "Claude Code 运行在终端里，可以自己执行命令并修复测试。",
+    "提示词越具体，得到的回答越稳定，也越容易复现。",
+    "Opus 模型适合复杂任务，Sonnet 在速度和成本之间更平衡。",
+    "API 用户可以通过 system prompt 固定输出格式。",
+    "处理 Excel 数据时，可以先描述表头含义再提出分析需求。",
+    "Use the API with streaming enabled to show partial answers as they arrive.",
+    "Long context windows make it practical to paste whole design documents.",
+    "Tool use lets the model call functions and read their results before answering.",
+    "Batch requests are cheaper when latency does not matter.",
+]
+STYLE_BLOCK = """
+        .prose h2 { font-family: 'Georgia', 'serif'; font-weight: 700; color: #1e293b; margin-top: 2rem; margin-bottom: 1rem; font-size: 1.5rem; }
+        .prose p { margin-bottom: 1rem; line-height: 1.75; color: #475569; }
+        .prose ul { list-style-type: disc; padding-left: 1.5rem; margin-bottom: 1rem; color: #475569; }
+"""
+
+def synthetic_post(i, seed):
+    """(filename, HTML) of synthetic post `i`; the same for every corpus size."""
+    rng = random.Random(f"{seed}-{i}")
+    stem, title_template = TOPICS[i % len(TOPICS)]
+    title = title_template.format(n=i + 1)
+    filename = f"{stem}-{i + 1}.html"
+    published = (EPOCH - timedelta(days=i % 3650)).isoformat()
+    description = ''.join(rng.sample(SENTENCES, 2))
+    keywords = ', '.join(['Claude', title.split('：')[0], rng.choice(HEADINGS)])
+    schema = json.dumps({
+        "@context": "https://schema.org", "@type": "BlogPosting",
+        "headline": title, "description": description, "datePublished": published,
+        "author": {"@type": "Organization", "name": "ClaudeMai"}
+    }, ensure_ascii=False)
+
+    sections = []
+    for heading in rng.sample(HEADINGS, rng.randint(4, 6)):
+        paragraphs = ''.join(f'<p>{"".join(rng.sample(SENTENCES, rng.randint(2, 4)))}</p>\n' for _ in range(rng.randint(2, 4)))
+        items = ''.join(f'<li>{escape(sentence)}</li>' for sentence in rng.sample(SENTENCES, 3))
+        sections.append(f'<h2 class="text-2xl font-bold text-slate-900">{heading}</h2>\n{paragraphs}<ul>{items}</ul>\n')
+
+    html = f"""<!DOCTYPE html>
+<html class="scroll-smooth" lang="zh-CN">
+<head>
+<meta charset="utf-8"/>
+<meta content="width=device-width, initial-scale=1.0" name="viewport"/>
+<title>{escape(title)} - ClaudeMai</title>
+<meta content="{escape(description)}" name="description"/>
+<meta content="{escape(keywords)}" name="keywords"/>
+<link href="https://claudemai.top/blog/{filename[:-5]}" rel="canonical"/>
+<style>{STYLE_BLOCK}</style>
+<script type="application/ld+json">{schema}</script>
+</head>
+<body class="bg-slate-50 text-slate-900 font-sans antialiased">
+<nav class="fixed w-full z-50 bg-white/80 backdrop-blur-md border-b border-slate-200"><a href="/">ClaudeMai</a></nav>
+<main class="pt-32 pb-20 sm:pt-40 sm:pb-24">
+<div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8"><div class="grid grid-cols-1 lg:grid-cols-12 gap-12"><div class="lg:col-span-8">
+<article class="prose prose-slate lg:prose-lg mx-auto bg-white p-8 md:p-12 rounded-3xl shadow-sm border border-slate-200">
+<h1 class="text-3xl md:text-4xl font-serif font-bold text-slate-900 mb-6">{escape(title)}</h1>
+<div class="flex items-center gap-4 mb-8 text-sm text-slate-500 border-b border-slate-100 pb-8"><time datetime="{published}" itemprop="datePublished">{published}</time></div>
+<p class="text-lg leading-relaxed mb-8">{escape(description)}</p>
+{''.join(sections)}</article>
+</div></div></div>
+</main>
+<footer class="bg-white border-t border-slate-200"><a href="/blog/">博客</a></footer>
+</body>
+</html>
+"""
+    return filename, html
+
+def git(*args):
+    return subprocess.run(['git', *args], cwd=ROOT_DIR, check=True, capture_output=True).stdout
+
+def describe_source(ref):
+    """(short commit, dirty) of what is benchmarked: `ref`, or the working tree."""
+    try:
+        commit = git('rev-parse', '--short', ref or 'HEAD').decode().strip()
+        dirty = not ref and bool(git('status', '--porcelain', '--untracked-files=no').strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+def prepare_site(site, ref, posts, seed):
+    """Copy the site and builder (the working tree, or `ref`) into `site` and replace the posts with a synthetic corpus."""
+    if ref:
+        with tarfile.open(fileobj=io.BytesIO(git('archive', '--format=tar', ref))) as tar:
+            tar.extractall(site)
+    else:
+        shutil.copytree(ROOT_DIR, site, ignore=COPY_IGNORE, dirs_exist_ok=True)
+    node_modules = os.path.join(ROOT_DIR, 'node_modules')
+    if os.path.isdir(node_modules): os.symlink(node_modules, os.path.join(site, 'node_modules'))
+    for name in GENERATED:
+        path = os.path.join(site, *name.split('/'))
+        if os.path.isdir(path): shutil.rmtree(path)
+        elif os.path.exists(path): os.remove(path)
+
+    blog_dir = os.path.join(site, 'blog')
+    for filename in os.listdir(blog_dir):
+        if filename.endswith('.html') and filename != 'index.html': os.remove(os.path.join(blog_dir, filename))
+    for i in range(posts):
+        filename, html = synthetic_post(i, seed)
+        with open(os.path.join(blog_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(html)
+    return os.path.join(blog_dir, synthetic_post(0, seed)[0])
+
+def edit_post(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        html = f.read()
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(html.replace('</article>', '<p>Benchmark edit: one more paragraph.</p></article>', 1))
+
+def output_size(site):
+    """(bytes, files) of the deployable tree: everything except build state, sources and caches."""
+    total = files = 0
+    for dirpath, dirnames, filenames in os.walk(site):
+        if dirpath == site: dirnames[:] = [d for d in dirnames if d not in SOURCE_DIRS]
+        for filename in filenames:
+            if filename.endswith(SOURCE_EXTENSIONS): continue
+            total += os.path.getsize(os.path.join(dirpath, filename))
+            files += 1
+    return total, files
+
+def run_build(site, build_args, log_path, phases):
+    """Run build.py in `site`. Returns (seconds, max RSS bytes, profile report or None)."""
+    report_path = os.path.join(site, '.build', 'bench-profile.json')
+    # Commits from before --profile existed are still timed, just without phases.
+    profile = ['--profile', report_path] if phases and os.path.exists(os.path.join(site, 'profiler.py')) else []
+    with open(log_path, 'ab') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, 'build.py', *profile, *build_args], cwd=site, stdout=log, stderr=subprocess.STDOUT)
+        # wait4 gives this child's own rusage; RUSAGE_CHILDREN would mix in earlier builds.
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode:
+        raise RuntimeError(f"build.py exited with {process.returncode}; see {log_path}")
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    report = None
+    if profile:
+        with open(report_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    return seconds, rss, report
+
+def bench_size(posts, args, build_args):
+    print(f"📦 {posts:,} posts: generating corpus...")
+    site = tempfile.mkdtemp(prefix=f"claudemai-bench-{posts}-")
+    try:
+        edited = prepare_site(site, args.ref, posts, args.seed)
+        log_path = os.path.join(site, 'bench.log')
+        runs = []
+        for scenario, extra in (('cold', ['--full']), ('noop', []), ('edit', [])):
+            if scenario == 'edit': edit_post(edited)
+            seconds, rss, report = run_build(site, [*build_args, *extra], log_path, args.phases)
+            size, files = output_size(site)
+            runs.append({
+                'posts': posts, 'scenario': scenario, 'seconds': round(seconds, 3), 'max_rss_bytes': rss,
+                'peak_traced_bytes': report['peak_bytes'] if report else None,
+                'output_bytes': size, 'output_files': files,
+                'phases': {phase['name']: round(phase['seconds'], 3) for phase in report['phases']} if report else {},
+            })
+            print(f"  {scenario:<5} {seconds:>9.2f}s  {rss / 1024 / 1024:>8.1f} MB RSS  {size / 1024 / 1024:>8.1f} MB output")
+        return runs
+    finally:
+        if args.keep: print(f"  Kept {site}")
+        else: shutil.rmtree(site, ignore_errors=True)
+
+def print_table(results, baseline=None):
+    before = {(run['posts'], run['scenario']): run for run in baseline['runs']} if baseline else {}
+    def delta(new, old):
+        return f" ({(new - old) / old:+.0%})" if old else ''
+    print(f"\n📊 {results['source']} ({results['commit'] or 'unknown commit'}{' + local changes' if results['dirty'] else ''})"
+          + (f" vs {baseline['source']} ({baseline['commit']})" if baseline else ''))
+    print(f"  {'posts':>7} {'scenario':<8} {'time':>18} {'RSS':>20} {'output':>12}")
+    for run in results['runs']:
+        old = before.get((run['posts'], run['scenario']), {})
+        rss = run['max_rss_bytes'] / 1024 / 1024
+        print(f"  {run['posts']:>7,} {run['scenario']:<8} {run['seconds']:>8.2f}s{delta(run['seconds'], old.get('seconds')):<8}"
+              f" {rss:>9.1f} MB{delta(run['max_rss_bytes'], old.get('max_rss_bytes')):<8} {run['output_bytes'] / 1024 / 1024:>9.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark build.py on synthetic corpora.")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="comma-separated post counts (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="corpus seed; keep it fixed to compare commits")
+    parser.add_argument('--phases', action='store_true', help="run the builds with --profile for per-phase time and traced memory (slower)")
+    parser.add_argument('--ref', help="benchmark the builder at this git ref instead of the working tree")
+    parser.add_argument('--jobs', type=int, help="passed to build.py")
+    parser.add_argument('--minify', action='store_true', help="passed to build.py")
+    parser.add_argument('--compress', action='store_true', help="passed to build.py")
+    parser.add_argument('--parser', help="passed to build.py")
+    parser.add_argument('--output', help="results JSON (default: .build/bench/<commit>.json)")
+    parser.add_argument('--compare', metavar='RESULTS', help="print the change against an earlier results JSON")
+    parser.add_argument('--keep', action='store_true', help="keep the generated sites")
+    args = parser.parse_args()
+
+    build_args = (['--jobs', str(args.jobs)] if args.jobs else []) + (['--minify'] if args.minify else []) \
+        + (['--compress'] if args.compress else []) + (['--parser', args.parser] if args.parser else [])
+    commit, dirty = describe_source(args.ref)
+    results = {
+        'source': args.ref or 'working tree', 'commit': commit, 'dirty': dirty,
+        'seed': args.seed, 'build_args': build_args, 'phases': args.phases,
+        'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+        'runs': [],
+    }
+    for posts in sorted(int(size) for size in args.sizes.split(',')):
+        results['runs'] += bench_size(posts, args, build_args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'unknown'}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    print(f"  Results written to {output}")
+
+if __name__ == "__main__":
+    main()
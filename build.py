@@ -1,10 +1,33 @@
 import os
 import re
+import sys
 import json
 import random
 import math
+import time
 import shutil
-from bs4 import BeautifulSoup
+import hashlib
+import contextlib
+import argparse
+import subprocess
+import concurrent.futures
+from html import escape
+import compress
+import parsing
+import output
+from profiler import BuildProfiler
+from output import write_if_changed
+from parsing import parse_html, parse_fragment
+import related
+from related import RelatedIndex, term_counts, top_terms
+import search
+import service_worker
+import sitemap
+from sitemap import SitemapWriter
+import fonts
+import styles
+from styles import StyleRegistry
+import tailwind
 from datetime import datetime
 import glob
 
@@ -13,50 +36,416 @@ DOMAIN = "https://claudemai.top"
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 BLOG_DIR = os.path.join(ROOT_DIR, 'blog')
 INDEX_PATH = os.path.join(ROOT_DIR, 'index.html')
+BUILD_STATE_DIR = os.path.join(ROOT_DIR, '.build')
+MANIFEST_PATH = os.path.join(BUILD_STATE_DIR, 'manifest.json')
+MANIFEST_VERSION = 1
+METADATA_CACHE_PATH = os.path.join(BUILD_STATE_DIR, 'metadata.json')
+# Bump whenever extract_metadata changes what it derives from a post.
+METADATA_CACHE_VERSION = 7
+RELATED_CACHE_PATH = os.path.join(BUILD_STATE_DIR, 'related.json')
+LASTMOD_PATH = os.path.join(BUILD_STATE_DIR, 'lastmod.json')
+LASTMOD_VERSION = 2
+PROFILE_REPORT_PATH = os.path.join(BUILD_STATE_DIR, 'profile.json')
+COMPRESSED_PATH = os.path.join(BUILD_STATE_DIR, 'compressed.json')
+COMPRESSED_VERSION = 1
+TAILWIND_STATE_PATH = os.path.join(BUILD_STATE_DIR, 'tailwind.json')
+TAILWIND_STATE_VERSION = 1
+SEARCH_STATE_PATH = os.path.join(BUILD_STATE_DIR, 'search.json')
+SEARCH_STATE_VERSION = 1
+DEPLOY_DIR = os.path.join(ROOT_DIR, 'dist') # --minify writes the deployable site here; the source pages stay prettified
+DEPLOY_STATE_PATH = os.path.join(BUILD_STATE_DIR, 'deploy.json')
+DEPLOY_STATE_VERSION = 1
+# Tooling, sources and build state that are not part of the published site.
+DEPLOY_IGNORE = ('.*', '__pycache__', 'node_modules', 'dist', 'tests', 'fonts', 'MasterTool', 'styles.json', '*.py', '*.md', '*.jsonl', '*.patch', '*.tmp', 'package*.json')
+ASSETS_DIR = os.path.join(ROOT_DIR, 'assets') # content-hashed build outputs, cached forever
+ASSETS_URL = '/assets'
+# Root-level images are also published in ASSETS_DIR under content-hashed names.
+FINGERPRINT_EXTENSIONS = ('.svg', '.png', '.jpg', '.jpeg', '.webp', '.gif', '.ico')
+FINGERPRINT_RE = re.compile(r'(?P<origin>' + re.escape(DOMAIN) + r')?/(?:' + ASSETS_URL.strip('/') + r'/)?(?P<stem>[^/]+?)(?:\.[0-9a-f]{12})?(?P<ext>\.[a-z]+)')
+HEADERS_PATH = os.path.join(ROOT_DIR, '_headers')
+SERVICE_WORKER_PATH = os.path.join(ROOT_DIR, service_worker.SCRIPT_PATH.strip('/'))
+# Cloudflare Pages header rules. Everything revalidates; hashed files never change, so they are cached for a year.
+HTML_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+FONTS_DIR = os.path.join(ROOT_DIR, 'fonts') # local font files to self-host
+FONT_OUTPUT_DIR = os.path.join(ASSETS_DIR, 'fonts')
+FONT_OUTPUT_URL = f"{ASSETS_URL}/fonts"
+FONTS_STATE_PATH = os.path.join(BUILD_STATE_DIR, 'fonts.json')
+FONTS_STATE_VERSION = 1
+# Post styles, categories and the rules that assign them.
+STYLES_PATH = os.path.join(ROOT_DIR, 'styles.json')
+DEFAULT_OG_IMAGE = 'https://claudemai.top/og-cover.svg'
 
 POSTS_PER_PAGE = 6
+# Most parsed posts held from metadata extraction until their rebuild; later ones are re-read
+# when rebuilt, so a cold build never holds the whole corpus's trees at once.
+PAGE_PARTS_LIMIT = 256
+# Client-side post index for the blog SPA: a manifest plus per-listing shards, named by content hash.
+POST_INDEX_DIR = os.path.join(BLOG_DIR, 'data')
+POST_INDEX_URL = '/blog/data'
+# A multiple of POSTS_PER_PAGE, so a page never spans two shards.
+POSTS_PER_SHARD = POSTS_PER_PAGE * 10
+# What the blog index renderer needs from a post, in record order.
+POST_INDEX_FIELDS = ['slug', 'title', 'description', 'date', 'style']
+POST_INDEX_STYLE_FIELDS = ['icon', 'bg_gradient', 'badge_color', 'badge_text']
+# Static, crawlable listings live under /blog/page/<n>/ and /blog/category/<slug>/[page/<n>/].
+LISTING_DIRS = [os.path.join(BLOG_DIR, 'page'), os.path.join(BLOG_DIR, 'category')]
+# Page links kept either side of the current page; the rest collapse into "…".
+PAGINATION_RADIUS = 2
+# Quiet time after the last keystroke before the blog index runs a search.
+SEARCH_DEBOUNCE_MS = 150
+# sitemap.xml, its numbered parts and their .gz siblings
+SITEMAP_FILE_RE = re.compile(r'sitemap(?:-\d+)?\.xml(?:\.gz)?')
 
-# Helper for Slug Generation (Automated approach)
-SLUG_MAPPING = {
-    # 1. Tutorial / Guide (新手必读)
-    "注册教程": "tutorial",
-    "新手必读": "tutorial",
-    "入门指南": "tutorial",
-    "购买指南": "tutorial",
-    "使用教程": "tutorial",
-    
-    # 2. Safety (避坑指南)
-    "避坑指南": "safety",
-    
-    # 3. Tools / Efficiency (效率工具)
-    "效率工具": "tools",
-    "编程开发": "tools",
-    "学术科研": "tools",
-    "前沿技术": "tools",
-    
-    # 4. Reviews / Models (深度评测)
-    "深度评测": "reviews",
-    "旗舰模型": "reviews",
-    
-    # 5. News (资讯)
-    "资讯": "news"
-}
-
-SLUG_DISPLAY_NAMES = {
-    "academic": "学术科研",
-    "safety": "避坑指南",
-    "reviews": "深度评测",
-    "models": "旗舰模型",
-    "pricing": "购买指南",
-    "tutorial": "新手必读", 
-    "tools": "效率工具",
-    "coding": "编程开发",
-    "news": "资讯",
-    "guide": "使用教程"
-}
+def file_digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def data_digest(data):
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# Elements whose surrounding whitespace never renders; inline elements keep a single space.
+BLOCK_TAGS = r'html|head|body|title|meta|link|base|div|section|article|main|nav|header|footer|aside|p|ul|ol|li|dl|dt|dd|h[1-6]|table|thead|tbody|tfoot|tr|td|th|blockquote|figure|figcaption|hr|br|form|fieldset|noscript|path|circle|rect|g|defs'
+RAW_BLOCK_RE = re.compile(r'<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>|<!--.*?-->', re.S | re.I)
+BLOCK_TAG_RE = re.compile(r'\s*(</?(?:' + BLOCK_TAGS + r')\b[^>]*>)\s*', re.I)
+TEXT_RUN_RE = re.compile(r'(?<=>)[^<]+|^[^<]+')
+
+def _collapse_whitespace(markup):
+    markup = TEXT_RUN_RE.sub(lambda m: re.sub(r'\s+', ' ', m.group(0)), markup)
+    return BLOCK_TAG_RE.sub(r'\1', markup)
+
+def minify_html(markup):
+    """Collapse insignificant whitespace and drop comments.
+
+    <pre>, <textarea>, <script> and <style> are copied through untouched, so
+    inline JS, CSS and code samples keep their exact content.
+    """
+    out = []
+    pos = 0
+    for m in RAW_BLOCK_RE.finditer(markup):
+        out.append(_collapse_whitespace(markup[pos:m.start()]))
+        block = m.group(0)
+        if not block.startswith('<!--') or block.startswith('<!--['):
+            if m.group(1) and m.group(1).lower() != 'textarea':
+                # Whitespace around block-level raw elements is insignificant too.
+                if out[-1].endswith(' '): out[-1] = out[-1][:-1]
+                out.append(block)
+                pos = m.end()
+                while pos < len(markup) and markup[pos].isspace(): pos += 1
+                continue
+            out.append(block)
+        pos = m.end()
+    out.append(_collapse_whitespace(markup[pos:]))
+    return ''.join(out).strip() + '\n'
+
+COMMENT_RE = re.compile(r'<!--(?!\[).*?-->', re.S)
+
+def main_digest(main):
+    # Whitespace and comments are left out, so reformatting a page does not count as a content change.
+    if not main: return ''
+    return data_digest(' '.join(COMMENT_RE.sub('', main.prettify()).split()))
+
+def url_path(url):
+    return os.path.join(ROOT_DIR, *url.strip('/').split('/'))
+
+def state_key(path):
+    return os.path.relpath(path, ROOT_DIR).replace(os.sep, '/')
+
+def load_state(path, version, field, label):
+    if not os.path.exists(path): return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (ValueError, OSError):
+        print(f"    {label} unreadable, starting from scratch.")
+        return {}
+    return data.get(field, {}) if data.get('version') == version else {}
+
+def save_state(path, version, field, entries):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_if_changed(path, json.dumps({'version': version, field: entries}, ensure_ascii=False, indent=1, sort_keys=True).encode('utf-8'))
+
+class BuildManifest:
+    """Persisted record of every output: its hash on disk and the inputs it was built from."""
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self.outputs = load_state(path, MANIFEST_VERSION, 'outputs', "Build manifest")
+        self.updated = {}
+
+    def is_fresh(self, path, inputs):
+        entry = self.outputs.get(state_key(path))
+        if not entry or entry.get('inputs') != inputs: return False
+        if not os.path.exists(path): return False
+        return file_digest(path) == entry.get('hash')
+
+    def record(self, path, inputs):
+        self.updated[state_key(path)] = {'hash': file_digest(path), 'inputs': inputs}
+
+    def keep(self, path):
+        key = state_key(path)
+        if key in self.outputs: self.updated[key] = self.outputs[key]
+
+    def is_own_output(self, path):
+        """True if `path` still holds exactly what the last build wrote (or kept)."""
+        entry = self.outputs.get(state_key(path))
+        return entry is not None and os.path.exists(path) and file_digest(path) == entry['hash']
+
+    def save(self):
+        save_state(self.path, MANIFEST_VERSION, 'outputs', self.updated)
+        self.outputs, self.updated = self.updated, {}
+
+class MetadataCache:
+    """Fields extracted from each post, reused while the file is unchanged.
+
+    An entry is valid when size and mtime match (no read at all), or failing
+    that when the content hash matches (one read, no parse), which covers
+    fresh checkouts where every mtime is new.
+    """
+
+    def __init__(self, path=METADATA_CACHE_PATH):
+        self.path = path
+        self.entries = load_state(path, METADATA_CACHE_VERSION, 'entries', "Metadata cache")
+        self.updated = {}
+        self.dirty = False # an entry was added or re-stamped since the last save
+
+    def get(self, file_path):
+        key = state_key(file_path)
+        entry = self.entries.get(key)
+        st = os.stat(file_path)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            self.updated[key] = entry
+            return entry['fields']
+        self.dirty = True
+        digest = file_digest(file_path)
+        if entry and entry['hash'] == digest:
+            self.updated[key] = dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns)
+            return entry['fields']
+        self.updated[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest, 'fields': None}
+        return None
+
+    def put(self, file_path, fields):
+        self.updated[state_key(file_path)]['fields'] = fields
+
+    def rekey(self, file_path, fields):
+        """Record `fields` for the file as it is now on disk (after the build rewrote it)."""
+        st = os.stat(file_path)
+        self.updated[state_key(file_path)] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': file_digest(file_path), 'fields': fields}
+        self.dirty = True
+
+    def save(self):
+        # Serializing every post's fields is the slow part, so a build that changed nothing skips it.
+        if not self.dirty and self.updated.keys() == self.entries.keys():
+            self.updated = {}
+            return
+        self.entries = {k: v for k, v in self.updated.items() if v['fields'] is not None}
+        self.updated = {}
+        self.dirty = False
+        save_state(self.path, METADATA_CACHE_VERSION, 'entries', self.entries)
+
+TAILWIND_CDN = "https://cdn.tailwindcss.com"
+GOOGLE_FONTS_CSS = "https://fonts.googleapis.com"
+GOOGLE_FONTS_FILES = "https://fonts.gstatic.com"
+FONT_FAMILIES = {'Inter': [400, 500, 600, 700], 'Noto Sans SC': [400, 500, 700, 800], 'JetBrains Mono': [400]}
+
+def fonts_stylesheet(families):
+    query = '&'.join(f"family={name.replace(' ', '+')}:wght@{';'.join(map(str, weights))}" for name, weights in families.items())
+    return f"{GOOGLE_FONTS_CSS}/css2?{query}&display=swap"
+
+def font_head(faces):
+    """Head markup for the site fonts: @font-face rules and preloads for self-hosted subsets, then the Google Fonts stylesheet for every other family."""
+    head = ''
+    if faces:
+        rules = ''.join(f"@font-face{{font-family:'{face['family']}';font-style:{face['style']};font-weight:{face['weight']};font-display:swap;src:url({face['url']}) format('woff2')}}" for face in faces)
+        # Only the regular faces are needed for first paint; bold and the like load when used.
+        for face in faces:
+            if face['style'] == 'normal' and (face['weight'] == '400' or ' ' in face['weight']):
+                head += f'<link as="font" crossorigin="" href="{escape(face["url"])}" rel="preload" type="font/woff2"/>\n'
+        head += f'<style data-fonts="">{rules}</style>\n'
+    local = {face['family'] for face in faces}
+    remote = {name: weights for name, weights in FONT_FAMILIES.items() if name not in local}
+    if remote:
+        href = escape(fonts_stylesheet(remote))
+        # display=swap shows fallback text at once; the stylesheet itself loads without blocking render.
+        head += (f'<link href="{GOOGLE_FONTS_CSS}" rel="preconnect"/>\n<link crossorigin="" href="{GOOGLE_FONTS_FILES}" rel="preconnect"/>\n'
+                 f'<link as="style" href="{href}" rel="preload"/>\n'
+                 f'<link href="{href}" media="print" onload="this.media=\'all\'" rel="stylesheet"/>\n'
+                 f'<noscript><link href="{href}" rel="stylesheet"/></noscript>\n')
+    return head
+
+# Likely next pages are prefetched as soon as a page loads; any other post link is prefetched on hover.
+PREFETCH_LIMIT = 3
+PREFETCH_HOVER_RULE = {'source': 'document', 'where': {'and': [{'href_matches': '/blog/*'}, {'not': {'href_matches': '/blog/category/*'}}]}, 'eagerness': 'moderate'}
+
+def prefetch_head(urls):
+    """Speculation rules prefetching `urls` and hovered post links, plus <link rel=prefetch> for browsers without them."""
+    rules = {'prefetch': ([{'source': 'list', 'urls': list(urls)}] if urls else []) + [PREFETCH_HOVER_RULE]}
+    fallback = (f"if(!(HTMLScriptElement.supports&&HTMLScriptElement.supports('speculationrules'))){{for(const href of {json.dumps(list(urls))}){{"
+                "const link=document.createElement('link');link.rel='prefetch';link.href=href;document.head.appendChild(link)}}")
+    return f'<script type="speculationrules">{json.dumps(rules)}</script>\n<script data-prefetch="">{fallback}</script>\n'
+
+TAILWIND_CONFIG = """
+        tailwind.config = {
+            theme: {
+                extend: {
+                    fontFamily: {
+                        sans: ['Inter', 'Noto Sans SC', 'sans-serif'],
+                        mono: ['JetBrains Mono', 'monospace'],
+                        serif: ['Georgia', 'serif'],
+                    },
+                    colors: {
+                        claude: { 50: '#fdf8f6', 100: '#f2e8e5', 500: '#e56f48', 600: '#da7756', 700: '#c55f3e', 900: '#4a2b20' }
+                    }
+                }
+            }
+        }
+        """
+BODY_CLASS = "bg-slate-50 text-slate-900 font-sans antialiased selection:bg-claude-600 selection:text-white"
+
+class PostLayout:
+    """Blog post chrome serialized to strings once per build.
+
+    Rendering a post only escapes and splices in its own fields and <main>,
+    instead of rebuilding the head, nav and footer as a DOM for every page.
+    """
+
+    def __init__(self, assets, stylesheet=None, fonts_html=None):
+        icons = ''.join(f"{icon}\n" for icon in assets['icons'])
+        # prettify() rather than str(): the chrome must not depend on whether index.html was last written minified.
+        nav = assets['nav'].prettify() if assets['nav'] else ''
+        footer = assets['footer'].prettify() if assets['footer'] else ''
+        self.doc_start = '<!DOCTYPE html>\n<html class="scroll-smooth" lang="zh-CN">\n<head>\n<meta charset="utf-8"/>\n<meta content="width=device-width, initial-scale=1.0" name="viewport"/>\n'
+        fonts = fonts_html if fonts_html is not None else font_head([])
+        if stylesheet:
+            css = f'<link href="{escape(stylesheet)}" rel="stylesheet"/>\n{fonts}'
+        else:
+            css = f'<script src="{TAILWIND_CDN}"></script>\n{fonts}<script>{TAILWIND_CONFIG}</script>\n'
+        self.head_shared = f'<meta content="index, follow" name="robots"/>\n{icons}{css}{service_worker.REGISTER}\n'
+
+        self.body_start = f'</head>\n<body class="{BODY_CLASS}">\n{nav}'
+        self.doc_end = f'\n{footer}</body>\n</html>\n'
+
+    def digest(self):
+        return data_digest([self.doc_start, self.head_shared, self.body_start, self.doc_end])
+
+    @staticmethod
+    def extracted_fields(post):
+        # What extract_metadata reads back from a rendered post.
+        return {'title': f"{post['title']} - ClaudeMai", 'description': post['description'], 'date': post['date'], 'image': post['image']}
+
+    def render(self, post, keywords, style_html, main_html, prefetch_urls=()):
+        schema_data = {
+            "@context": "https://schema.org", "@type": "BlogPosting",
+            "headline": post['title'], "description": post['description'], "datePublished": post['date'],
+            "author": { "@type": "Organization", "name": "ClaudeMai" }
+        }
+        # "</" would end the script element early; "<\/" is the same JSON string.
+        schema_json = json.dumps(schema_data, ensure_ascii=False).replace('</', '<\\/')
+        return ''.join([
+            self.doc_start,
+            f"<title>{escape(post['title'], quote=False)} - ClaudeMai</title>\n",
+            f'<meta content="{escape(post["description"])}" name="description"/>\n',
+            f'<meta content="{escape(keywords)}" name="keywords"/>\n',
+            f'<link href="{escape(DOMAIN + post["url"])}" rel="canonical"/>\n',
+            f'<meta content="{escape(post["image"])}" property="og:image"/>\n',
+            self.head_shared,
+            prefetch_head(prefetch_urls),
+            f"{style_html}\n" if style_html else '',
+            f'<script type="application/ld+json">{schema_json}</script>\n',
+            self.body_start,
+            main_html,
+            self.doc_end
+        ])
+
+class ListingLayout:
+    """Blog index chrome (head, header, sidebar, footer) serialized to strings for the static listing pages.
+
+    The page-specific head tags and the header text are cut out of blog/index.html
+    and the post list column is emptied; render() splices a listing back in.
+    """
+
+    MARKERS = ['@@listing-head@@', '@@listing-title@@', '@@listing-intro@@', '@@listing-content@@']
+
+    def __init__(self, soup, article_container):
+        head = soup.head
+        for tag in head.find_all(['title', 'script'], recursive=False):
+            if tag.name == 'title' or tag.get('type') == 'application/ld+json': tag.decompose()
+        for tag in head.find_all(['meta', 'link'], recursive=False):
+            key = tag.get('name') or tag.get('property') or ''
+            rel = tag.get('rel') or []
+            if key in ('description', 'og:url', 'og:title', 'og:description', 'twitter:title', 'twitter:description') or 'canonical' in rel or ('alternate' in rel and tag.get('hreflang')):
+                tag.decompose()
+        head.append(self.MARKERS[0])
+        header = soup.find('header')
+        title = header.find('h1') if header else None
+        intro = title.find_next_sibling('p') if title else None
+        for tag, marker in ((title, self.MARKERS[1]), (intro, self.MARKERS[2])):
+            if tag:
+                tag.clear()
+                tag.append(marker)
+        article_container.clear()
+        article_container.append(self.MARKERS[3])
+
+        markup = str(soup)
+        self.parts = []
+        for marker in self.MARKERS:
+            before, _, markup = markup.partition(marker)
+            self.parts.append(before)
+        self.parts.append(markup)
+
+    def digest(self):
+        return data_digest(self.parts)
+
+    def render(self, title, description, url, heading, intro, content, prefetch_urls=()):
+        head = (
+            f"<title>{escape(title, quote=False)}</title>\n"
+            f'<meta content="{escape(description)}" name="description"/>\n'
+            f'<link href="{escape(DOMAIN + url)}" rel="canonical"/>\n'
+            f'<meta content="{escape(DOMAIN + url)}" property="og:url"/>\n'
+            f'<meta content="{escape(title)}" property="og:title"/>\n'
+            f'<meta content="{escape(description)}" property="og:description"/>\n'
+            + prefetch_head(prefetch_urls)
+        )
+        fills = [head, escape(heading, quote=False), escape(intro, quote=False), content]
+        return ''.join(part + fill for part, fill in zip(self.parts, fills)) + self.parts[-1]
+
+def pagination_window(current, total, radius=PAGINATION_RADIUS):
+    """Page numbers to link for `current` of `total`, with None for each collapsed gap."""
+    pages = sorted({1, total} | set(range(max(1, current - radius), min(total, current + radius) + 1)))
+    window = []
+    for page in pages:
+        if window and page - window[-1] > 1: window.append(None)
+        window.append(page)
+    return window
+
+class LastmodStore:
+    """Content digest and lastmod date of every sitemap URL; the date only moves when the page's own content changes."""
+
+    def __init__(self, path=LASTMOD_PATH):
+        self.path = path
+        self.entries = load_state(path, LASTMOD_VERSION, 'urls', "Lastmod store")
+        self.updated = {}
+
+    def lastmod(self, loc, digest, first_seen=None):
+        entry = self.entries.get(loc)
+        if entry and entry['hash'] == digest:
+            lastmod = entry['lastmod']
+        else:
+            # New URLs start from their publish date; changed ones are stamped with today.
+            lastmod = first_seen if not entry and first_seen else datetime.now().strftime('%Y-%m-%d')
+        self.updated[loc] = {'hash': digest, 'lastmod': lastmod}
+        return lastmod
+
+    def save(self):
+        self.entries, self.updated = self.updated, {}
+        save_state(self.path, LASTMOD_VERSION, 'urls', self.entries)
 
 class SiteBuilder:
-    def __init__(self):
+    def __init__(self, full=False, jobs=1, minify=False, compress=False, profiler=None):
         self.assets = {
             'nav': None,
             'footer': None,
@@ -64,35 +453,130 @@ class SiteBuilder:
         }
         self.posts_metadata = []
         self.categories = {} # {slug: {name: str, posts: []}}
+        self.full = full
+        self.jobs = jobs
+        self.minify = minify
+        self.compress = compress
+        self.profiler = profiler # BuildProfiler in --profile mode
+        self.manifest = BuildManifest()
+        self.metadata_cache = MetadataCache()
+        self.lastmods = LastmodStore()
+        self.styles = StyleRegistry.load(STYLES_PATH)
+        self.related_index = RelatedIndex(RELATED_CACHE_PATH) if RelatedIndex.available else None
+        self.related = {} # {post url: [related post urls]}
+        self.post_terms = {} # {post url: top weighted term counts} feeding the related and search indexes
+        self.post_term_digests = {} # {post url: related.doc_digest() of its terms}
+        self.post_classes = {} # {post url: class names in its <main>}
+        self.post_glyphs = {} # {post url: non-ASCII characters in its <main>, title and description}
+        self.post_content = {} # {post url: main_digest() of its <main>, without the 推荐阅读 block}
+        self.font_faces = [] # self-hosted font subsets: {family, weight, style, url}
+        self.font_html = font_head([])
+        self.stylesheet = None # URL of the compiled Tailwind stylesheet, None while pages use the CDN
+        self.posts_by_url = {}
+        self.inputs = {} # {input key: digest} for the dependency graph
+        self.page_parts = {} # {file_path: parts of the parsed post kept for reconstruct_page}
+        self.changed = []
+        self.layout = None
+        self.assets_digest = None # index.html hash (and fingerprints) the current assets were extracted from
+        self.fingerprints = {} # {'/logo.svg': '/assets/logo.<hash>.svg'}
+        self.listing_shards = {} # listing slug -> shard URLs in the post index
+        self.post_index_urls = [] # post index files the blog index fetches first
+        self.listing_layout = None
+        self.listing_source_digest = None # blog/index.html hash the listing layout was extracted from
 
     def run(self):
-        print("🚀 Starting build process...")
+        print(f"🚀 Starting build process (parser: {parsing.PARSER})...")
+        # Per-run state. The manifest, metadata cache and chrome survive between runs in watch mode.
+        self.posts_metadata = []
+        self.categories = {}
+        self.inputs = {}
+        self.page_parts = {}
+        self.post_terms = {}
+        self.post_term_digests = {}
+        self.post_classes = {}
+        self.post_glyphs = {}
+        self.post_content = {}
+        self.changed = [] # output paths written or removed by this run
+        if file_digest(STYLES_PATH) != self.styles.digest:
+            self.styles = StyleRegistry.load(STYLES_PATH)
         
+        if self.profiler: self.profiler.start()
+
         # Phase 1: Smart Extraction
         print("Phase 1: Extracting assets from index.html...")
-        self.extract_assets()
+        with self.phase('extract_assets'):
+            self.fingerprint_assets()
+            self.extract_assets()
         
         # Phase 1.5: Collect Metadata
         print("Phase 1.5: Collecting blog metadata...")
-        self.collect_metadata()
+        with self.phase('collect_metadata'):
+            self.collect_metadata()
+            self.update_related()
+
+        # Phase 1.6: Static Tailwind stylesheet
+        print("Phase 1.6: Building Tailwind stylesheet...")
+        with self.phase('build_stylesheet'):
+            page_classes, page_chars = self.scan_pages()
+            self.build_stylesheet(page_classes)
+
+        # Phase 1.7: Self-hosted font subsets
+        print("Phase 1.7: Subsetting fonts...")
+        with self.phase('build_fonts'):
+            self.build_fonts(page_chars)
+            self.layout = PostLayout(self.assets, self.stylesheet, self.font_html)
+            self.compute_inputs()
         
         # Phase 2 & 3: Process Blog Posts
         print("Phase 2 & 3: Processing blog posts...")
-        self.process_blog_posts()
+        with self.phase('process_blog_posts'):
+            self.process_blog_posts()
         
         # Phase 3.4: Global Update (Homepage)
         print("Phase 3.4: Updating homepage...")
-        self.update_homepage()
+        with self.phase('update_homepage'):
+            self.update_homepage()
         
         # Phase 3.5: Process Blog Index (Intelligent Single Page)
         print("Phase 3.5: Processing blog index (SPA Mode)...")
-        self.process_blog_index_spa()
+        with self.phase('process_blog_index_spa'):
+            self.process_blog_index_spa()
+
+        # Phase 3.6: Static category & pagination pages
+        print("Phase 3.6: Generating static listing pages...")
+        with self.phase('generate_listing_pages'):
+            self.generate_listing_pages()
         
         # Phase 4: Generate Sitemap
         print("Phase 4: Generating sitemap.xml...")
-        self.generate_sitemap()
+        with self.phase('generate_sitemap'):
+            self.generate_sitemap()
+        with self.phase('write_service_worker'):
+            self.write_service_worker()
+            self.write_headers()
         
-        print(f"✅ Build completed successfully at {datetime.now().strftime('%H:%M:%S')}")
+        with self.phase('save_state'):
+            self.manifest.save()
+            self.metadata_cache.save()
+            self.lastmods.save()
+
+        # Phase 4.5: Minified copy of the site for deployment
+        if self.minify:
+            print(f"Phase 4.5: Writing the minified site to {os.path.basename(DEPLOY_DIR)}/...")
+            with self.phase('write_deploy_copy'):
+                self.write_deploy_copy()
+
+        # Phase 5: Precompressed siblings for the static host
+        if self.compress:
+            print("Phase 5: Precompressing outputs...")
+            with self.phase('compress_outputs'):
+                self.compress_outputs()
+        print(f"✅ Build completed successfully at {datetime.now().strftime('%H:%M:%S')} ({len(self.changed)} outputs changed)")
+        if self.profiler: self.profiler.finish()
+        return self.changed
+
+    def phase(self, name):
+        return self.profiler.phase(name) if self.profiler else contextlib.nullcontext()
 
     def clean_link(self, url):
         if not url: return url
@@ -130,15 +614,21 @@ class SiteBuilder:
     def extract_assets(self):
         if not os.path.exists(INDEX_PATH):
             raise FileNotFoundError(f"index.html not found at {INDEX_PATH}")
+        digest = data_digest([file_digest(INDEX_PATH), self.fingerprints])
+        if digest == self.assets_digest: return
+        self.assets_digest = digest
+        self.assets['icons'] = []
         with open(INDEX_PATH, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
+            soup = parse_html(f.read())
         nav = soup.find('nav')
         if nav:
             self.process_links(nav)
+            self.fingerprint_refs(nav)
             self.assets['nav'] = nav
         footer = soup.find('footer')
         if footer:
             self.process_links(footer)
+            self.fingerprint_refs(footer)
             self.assets['footer'] = footer
         head = soup.find('head')
         if head:
@@ -149,74 +639,120 @@ class SiteBuilder:
                     if href:
                         if not href.startswith('http') and not href.startswith('/'):
                             href = '/' + href
-                        link['href'] = href
+                        link['href'] = self.fingerprint_url(href)
                         self.assets['icons'].append(link)
 
+    def fingerprint_assets(self):
+        """Publish the root-level images under content-hashed names in ASSETS_DIR."""
+        self.fingerprints = {}
+        for filename in sorted(os.listdir(ROOT_DIR)):
+            stem, ext = os.path.splitext(filename)
+            if ext.lower() not in FINGERPRINT_EXTENSIONS: continue
+            with open(os.path.join(ROOT_DIR, filename), 'rb') as f: data = f.read()
+            hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            os.makedirs(ASSETS_DIR, exist_ok=True)
+            path = os.path.join(ASSETS_DIR, hashed)
+            if write_if_changed(path, data): self.changed.append(path)
+            self.fingerprints[f"/{filename}"] = f"{ASSETS_URL}/{hashed}"
+
+        current = {url.rsplit('/', 1)[-1] for url in self.fingerprints.values()}
+        if os.path.isdir(ASSETS_DIR):
+            for filename in os.listdir(ASSETS_DIR):
+                if filename.lower().endswith(FINGERPRINT_EXTENSIONS) and filename not in current:
+                    self.remove_output(os.path.join(ASSETS_DIR, filename))
+
+    def fingerprint_url(self, url):
+        """The content-hashed URL of a root-level image (absolute URLs stay absolute), or `url` unchanged."""
+        m = FINGERPRINT_RE.fullmatch(url or '')
+        hashed = m and self.fingerprints.get(f"/{m.group('stem')}{m.group('ext')}")
+        return (m.group('origin') or '') + hashed if hashed else url
+
+    def fingerprint_refs(self, root):
+        for tag in [root] + root.find_all(True):
+            for attr in ('href', 'src', 'content'):
+                if tag.get(attr): tag[attr] = self.fingerprint_url(tag[attr])
+
+    def write_headers(self):
+        """Cloudflare Pages _headers: HTML and unhashed files revalidate, content-hashed outputs are immutable."""
+        rules = [('/*', [f"Cache-Control: {HTML_CACHE_CONTROL}"])]
+        for url in (ASSETS_URL, POST_INDEX_URL):
+            # Headers of every matching rule are combined, so the catch-all value is detached first.
+            rules.append((f"{url}/*", ["! Cache-Control", f"Cache-Control: {IMMUTABLE_CACHE_CONTROL}"]))
+        text = "# Generated by build.py; changes here are overwritten.\n" + ''.join(f"{path}\n" + ''.join(f"  {header}\n" for header in headers) for path, headers in rules)
+        if write_if_changed(HEADERS_PATH, text.encode('utf-8')): self.changed.append(HEADERS_PATH)
+
+    def write_service_worker(self):
+        """Write the precache manifest (content-hashed, in ASSETS_DIR) and the sw.js that points at it."""
+        def revision(path):
+            entry = self.manifest.updated.get(state_key(path))
+            return entry['hash'][:12] if entry else None
+
+        precache = {}
+        for url, path in (('/', INDEX_PATH), ('/blog/', os.path.join(BLOG_DIR, 'index.html'))):
+            if revision(path): precache[url] = revision(path)
+        hashed = self.post_index_urls + ([self.stylesheet] if self.stylesheet else []) + [face['url'] for face in self.font_faces] + sorted(self.fingerprints.values())
+        precache.update((url, None) for url in hashed)
+        posts = {post['url']: revision(post['file_path']) for post in self.posts_metadata if revision(post['file_path'])}
+        assets = []
+        for directory in (ASSETS_DIR, POST_INDEX_DIR):
+            for dirpath, _, filenames in os.walk(directory):
+                for filename in filenames:
+                    if filename.startswith('precache.') or filename.endswith(('.gz', '.br', '.tmp')): continue
+                    assets.append('/' + state_key(os.path.join(dirpath, filename)))
+
+        payload = json.dumps({'precache': precache, 'posts': posts, 'assets': sorted(assets)}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        filename = f"precache.{hashlib.sha256(payload).hexdigest()[:12]}.json"
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        path = os.path.join(ASSETS_DIR, filename)
+        if write_if_changed(path, payload): self.changed.append(path)
+        for name in os.listdir(ASSETS_DIR):
+            if re.fullmatch(r'precache\.[0-9a-f]{12}\.json', name) and name != filename:
+                self.remove_output(os.path.join(ASSETS_DIR, name))
+
+        script = service_worker.render(f"{ASSETS_URL}/{filename}", [f"{ASSETS_URL}/", f"{POST_INDEX_URL}/"])
+        if write_if_changed(SERVICE_WORKER_PATH, script.encode('utf-8')): self.changed.append(SERVICE_WORKER_PATH)
+        print(f"  Service worker precaches {len(precache)} URLs and tracks {len(posts)} posts.")
+
     def collect_metadata(self):
-        blog_files = glob.glob(os.path.join(BLOG_DIR, '*.html'))
+        blog_files = sorted(glob.glob(os.path.join(BLOG_DIR, '*.html')))
+        cached = 0
         for file_path in blog_files:
             filename = os.path.basename(file_path)
             if filename == 'index.html': continue
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                soup = BeautifulSoup(f.read(), 'html.parser')
-
-            title = soup.title.string if soup.title else filename
-            if title:
-                title = title.strip()
-                title = re.sub(r'\s*20\d{2}\s*', ' ', title).strip()
-                title = re.sub(r'\s+', ' ', title)
-            
-            desc_tag = soup.find('meta', attrs={'name': 'description'})
-            description = desc_tag['content'].strip() if desc_tag and desc_tag.get('content') else ''
+            fields = self.metadata_cache.get(file_path)
+            if fields is not None:
+                cached += 1
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    soup = parse_html(f.read())
+                fields = self.extract_metadata(soup, filename)
+                self.metadata_cache.put(file_path, fields)
 
-            date_str = None
-            json_scripts = soup.find_all('script', type='application/ld+json')
-            for script in json_scripts:
-                try:
-                    data = json.loads(script.string)
-                    if isinstance(data, list):
-                        for item in data:
-                            if item.get('@type') == 'BlogPosting' and item.get('datePublished'):
-                                date_str = item['datePublished']
-                                break
-                    elif isinstance(data, dict):
-                         if data.get('@type') == 'BlogPosting' and data.get('datePublished'):
-                            date_str = data['datePublished']
-                except: pass
-            
-            if date_str:
-                print(f"    Found date in JSON-LD: {date_str}")
-            
-            if not date_str:
-                date_str = datetime.now().strftime('%Y-%m-%d')
-                print(f"    No JSON-LD date found. Defaulting to today: {date_str}")
-                date_pattern = re.compile(r'\d{4}-\d{2}-\d{2}')
-                text_nodes = soup.find_all(string=date_pattern)
-                for node in text_nodes:
-                    if node.parent.name not in ['script', 'style', 'head', 'title', 'meta']:
-                        date_str = node.strip()
-                        print(f"    Found date in text content: {date_str}")
-                        break
-            
-            date_match = re.search(r'\d{4}-\d{2}-\d{2}', str(date_str))
-            if date_match: date_str = date_match.group(0)
-            else: date_str = datetime.now().strftime('%Y-%m-%d')
+                # Keep only what reconstruct_page needs, and only for posts it will rewrite; the rest of the tree is released here.
+                # Parallel workers read their own copy, so there is nothing to carry over.
+                if self.jobs <= 1 and len(self.page_parts) < PAGE_PARTS_LIMIT and (self.full or not self.manifest.is_own_output(file_path)):
+                    self.page_parts[file_path] = self.extract_page_parts(soup)
+                soup.decompose()
 
-            og_image = soup.find('meta', property='og:image')
-            image = og_image['content'] if og_image else 'https://claudemai.top/og-cover.svg'
+            title = fields['title']
             url = f"/blog/{filename.replace('.html', '')}"
-            style = self.determine_post_style(title, filename)
+            self.post_terms[url] = fields['terms']
+            self.post_term_digests[url] = fields['terms_digest']
+            self.post_classes[url] = fields['classes']
+            self.post_glyphs[url] = fields['glyphs']
+            self.post_content[url] = fields['content']
+            style = self.styles.classify(title, filename)
             
             category_name = style['badge_text']
-            category_slug = SLUG_MAPPING.get(category_name, 'news')
+            category_slug = style['category']
 
             post_data = {
                 'title': title.split(' - ')[0].strip(),
-                'description': description,
-                'date': date_str,
+                'description': fields['description'],
+                'date': fields['date'],
                 'url': url,
-                'image': image,
+                'image': self.fingerprint_url(fields['image']),
                 'filename': filename,
                 'file_path': file_path,
                 'style': style,
@@ -228,110 +764,410 @@ class SiteBuilder:
 
             if category_slug not in self.categories:
                 # Use standardized display name
-                display_name = SLUG_DISPLAY_NAMES.get(category_slug, category_name)
+                display_name = self.styles.category_name(category_slug)
                 self.categories[category_slug] = {'name': display_name, 'posts': []}
             self.categories[category_slug]['posts'].append(post_data)
         
         self.posts_metadata.sort(key=lambda x: x['date'], reverse=True)
         for cat in self.categories.values():
             cat['posts'].sort(key=lambda x: x['date'], reverse=True)
+        print(f"  {cached}/{len(self.posts_metadata)} posts loaded from the metadata cache.")
 
-    def process_blog_posts(self):
-        for post in self.posts_metadata:
-            print(f"  Processing {post['filename']}...")
-            self.reconstruct_page(post)
-
-    def reconstruct_page(self, post):
-        file_path = post['file_path']
-        with open(file_path, 'r', encoding='utf-8') as f:
-            original_soup = BeautifulSoup(f.read(), 'html.parser')
+    def extract_metadata(self, soup, filename):
+        title = soup.title.string if soup.title else filename
+        if title:
+            title = title.strip()
+            title = re.sub(r'\s*20\d{2}\s*', ' ', title).strip()
+            title = re.sub(r'\s+', ' ', title)
+        
+        desc_tag = soup.find('meta', attrs={'name': 'description'})
+        description = desc_tag['content'].strip() if desc_tag and desc_tag.get('content') else ''
 
-        new_soup = BeautifulSoup('<!DOCTYPE html><html lang="zh-CN" class="scroll-smooth"></html>', 'html.parser')
-        html = new_soup.html
+        date_str = None
+        json_scripts = soup.find_all('script', type='application/ld+json')
+        for script in json_scripts:
+            try:
+                data = json.loads(script.string)
+                if isinstance(data, list):
+                    for item in data:
+                        if item.get('@type') == 'BlogPosting' and item.get('datePublished'):
+                            date_str = item['datePublished']
+                            break
+                elif isinstance(data, dict):
+                     if data.get('@type') == 'BlogPosting' and data.get('datePublished'):
+                        date_str = data['datePublished']
+            except: pass
         
-        head = new_soup.new_tag('head')
-        html.append(head)
-        head.append(new_soup.new_tag('meta', charset='utf-8'))
-        head.append(new_soup.new_tag('meta', attrs={'name': 'viewport', 'content': 'width=device-width, initial-scale=1.0'}))
-        title_tag = new_soup.new_tag('title')
-        title_tag.string = f"{post['title']} - ClaudeMai"
-        head.append(title_tag)
-        head.append(new_soup.new_tag('meta', attrs={'name': 'description', 'content': post['description']}))
-        keywords_tag = original_soup.find('meta', attrs={'name': 'keywords'})
-        keywords = keywords_tag['content'] if keywords_tag else "Claude, Claude AI"
-        head.append(new_soup.new_tag('meta', attrs={'name': 'keywords', 'content': keywords}))
-        canonical_url = f"{DOMAIN}{post['url']}"
-        head.append(new_soup.new_tag('link', rel='canonical', href=canonical_url))
-        head.append(new_soup.new_tag('meta', attrs={'name': 'robots', 'content': 'index, follow'}))
+        if date_str:
+            print(f"    Found date in JSON-LD: {date_str}")
         
-        for icon in self.assets['icons']: head.append(icon) 
-        head.append(new_soup.new_tag('script', src="https://cdn.tailwindcss.com"))
-        head.append(new_soup.new_tag('link', href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&family=Noto+Sans+SC:wght@400;500;700;800&family=JetBrains+Mono:wght@400&display=swap", rel="stylesheet"))
+        if not date_str:
+            date_str = datetime.now().strftime('%Y-%m-%d')
+            print(f"    No JSON-LD date found. Defaulting to today: {date_str}")
+            date_pattern = re.compile(r'\d{4}-\d{2}-\d{2}')
+            text_nodes = soup.find_all(string=date_pattern)
+            for node in text_nodes:
+                if node.parent.name not in ['script', 'style', 'head', 'title', 'meta']:
+                    date_str = node.strip()
+                    print(f"    Found date in text content: {date_str}")
+                    break
         
-        tailwind_config = """
-        tailwind.config = {
-            theme: {
-                extend: {
-                    fontFamily: {
-                        sans: ['Inter', 'Noto Sans SC', 'sans-serif'],
-                        mono: ['JetBrains Mono', 'monospace'],
-                        serif: ['Georgia', 'serif'],
-                    },
-                    colors: {
-                        claude: { 50: '#fdf8f6', 100: '#f2e8e5', 500: '#e56f48', 600: '#da7756', 700: '#c55f3e', 900: '#4a2b20' }
-                    }
-                }
-            }
+        date_match = re.search(r'\d{4}-\d{2}-\d{2}', str(date_str))
+        if date_match: date_str = date_match.group(0)
+        else: date_str = datetime.now().strftime('%Y-%m-%d')
+
+        og_image = soup.find('meta', property='og:image')
+        image = og_image['content'] if og_image else DEFAULT_OG_IMAGE
+
+        # Body text for the related-post and search indexes, without the generated 推荐阅读 block.
+        article = soup.find('article') or soup.find('main')
+        body = ''
+        if article:
+            self.strip_recommendations(article)
+            body = article.get_text(' ')
+        # Only the top terms are kept; the long tail made the cache (and its save) grow with every post.
+        terms = top_terms(term_counts(title, description, body))
+        # Class names carried over from <main>, for the Tailwind stylesheet.
+        main = soup.find('main')
+        classes = sorted({c for tag in ([main] + main.find_all(class_=True) if main else []) for c in tag.get('class', [])})
+        # ...and the characters it shows, for the font subsets.
+        glyphs = ''.join(sorted(fonts.extra_chars((str(main) if main else '') + title + description)))
+        # ...and its content as reconstruct_page() writes it, for the sitemap lastmod.
+        if main: self.sync_main(main, date_str)
+        return {'title': title, 'description': description, 'date': date_str, 'image': image, 'terms': terms, 'terms_digest': related.doc_digest(terms), 'classes': classes, 'glyphs': glyphs, 'content': main_digest(main)}
+
+    def scan_pages(self):
+        """Class candidates and characters of the hand-written pages, without the regions the build regenerates."""
+        soups = []
+        if os.path.exists(INDEX_PATH):
+            with open(INDEX_PATH, 'r', encoding='utf-8') as f: soup = parse_html(f.read())
+            grid = self.homepage_grid(soup)
+            if grid: grid.clear()
+            self.strip_prefetch(soup)
+            self.apply_service_worker(soup)
+            soups.append(soup)
+        blog_index_path = os.path.join(BLOG_DIR, 'index.html')
+        if os.path.exists(blog_index_path):
+            soups.append(self.load_blog_index(blog_index_path)[0])
+        classes, chars = set(), set()
+        for soup in soups:
+            classes |= self.page_candidates(soup)
+            chars |= fonts.extra_chars(str(soup))
+            soup.decompose()
+        return classes, chars
+
+    def build_stylesheet(self, page_classes):
+        """Compile the Tailwind CSS the site uses into a content-hashed stylesheet, or leave self.stylesheet None (CDN)."""
+        candidates = set(page_classes)
+        for classes in self.post_classes.values(): candidates.update(classes)
+        # Card templates, the SPA script and per-style badge colors only exist as strings in the builder.
+        for path in (os.path.abspath(__file__), STYLES_PATH):
+            with open(path, 'r', encoding='utf-8') as f: candidates |= tailwind.source_candidates(f.read())
+
+        inputs = data_digest([sorted(candidates), TAILWIND_CONFIG, tailwind.INPUT_CSS])
+        state = load_state(TAILWIND_STATE_PATH, TAILWIND_STATE_VERSION, 'stylesheet', "Tailwind state")
+        if state and state['inputs'] == inputs and os.path.exists(url_path(state['url'])) and not self.full:
+            self.stylesheet = state['url']
+            print(f"  Stylesheet is up to date ({len(candidates)} class candidates).")
+            return
+
+        cli = tailwind.find_cli(ROOT_DIR)
+        if not cli:
+            self.stylesheet = None
+            print("  ⚠️ tailwindcss CLI not found; pages keep the Tailwind CDN. Install it with: npm install")
+        else:
+            try:
+                css = tailwind.compile_css(cli, candidates, TAILWIND_CONFIG)
+            except (OSError, subprocess.CalledProcessError) as e:
+                detail = e.stderr.decode('utf-8', 'replace').strip() if getattr(e, 'stderr', None) else e
+                print(f"  ⚠️ tailwindcss failed, pages keep the Tailwind CDN: {detail}")
+                css = None
+            if css is not None:
+                filename = f"tailwind.{hashlib.sha256(css).hexdigest()[:12]}.css"
+                os.makedirs(ASSETS_DIR, exist_ok=True)
+                path = os.path.join(ASSETS_DIR, filename)
+                if write_if_changed(path, css): self.changed.append(path)
+                self.stylesheet = f"{ASSETS_URL}/{filename}"
+                save_state(TAILWIND_STATE_PATH, TAILWIND_STATE_VERSION, 'stylesheet', {'inputs': inputs, 'url': self.stylesheet})
+                print(f"  Compiled {filename} ({len(css):,} bytes) from {len(candidates)} class candidates.")
+            else:
+                self.stylesheet = None
+
+        if os.path.isdir(ASSETS_DIR):
+            for filename in os.listdir(ASSETS_DIR):
+                if re.fullmatch(r'tailwind\.[0-9a-f]{12}\.css', filename) and f"{ASSETS_URL}/{filename}" != self.stylesheet:
+                    self.remove_output(os.path.join(ASSETS_DIR, filename))
+
+    def build_fonts(self, page_chars):
+        """Subset the local font files to every character the site uses; self.font_faces stays empty while Google Fonts serves everything."""
+        sources = sorted(os.path.join(FONTS_DIR, f) for f in os.listdir(FONTS_DIR) if f.lower().endswith(fonts.EXTENSIONS)) if os.path.isdir(FONTS_DIR) else []
+        self.font_faces = []
+        if sources and not fonts.available:
+            print("  ⚠️ fontTools not installed; fonts stay on Google Fonts. Install it with: pip install fonttools brotli")
+        elif sources:
+            chars = set(page_chars)
+            for glyphs in self.post_glyphs.values(): chars.update(glyphs)
+            # Template text (推荐阅读, pagination labels, category names) only exists in the builder.
+            for path in (os.path.abspath(__file__), STYLES_PATH):
+                with open(path, 'r', encoding='utf-8') as f: chars |= fonts.extra_chars(f.read())
+            text = ''.join(sorted(chars))
+            inputs = data_digest([text, [[state_key(path), file_digest(path)] for path in sources], file_digest(fonts.__file__)])
+            state = load_state(FONTS_STATE_PATH, FONTS_STATE_VERSION, 'fonts', "Font state")
+            if state and state['inputs'] == inputs and not self.full and all(os.path.exists(url_path(face['url'])) for face in state['faces']):
+                self.font_faces = state['faces']
+                print(f"  Font subsets are up to date ({len(self.font_faces)} faces, {len(text)} characters).")
+            else:
+                if self.jobs > 1 and len(sources) > 1:
+                    with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                        results = list(executor.map(fonts.subset_font, sources, [text] * len(sources)))
+                else:
+                    results = [fonts.subset_font(path, text) for path in sources]
+                os.makedirs(FONT_OUTPUT_DIR, exist_ok=True)
+                for source, (family, weight, style, data) in zip(sources, results):
+                    slug = re.sub(r'[^a-z0-9]+', '-', f"{family} {weight} {style}".lower()).strip('-')
+                    filename = f"{slug}.{hashlib.sha256(data).hexdigest()[:12]}.woff2"
+                    path = os.path.join(FONT_OUTPUT_DIR, filename)
+                    if write_if_changed(path, data): self.changed.append(path)
+                    self.font_faces.append({'family': family, 'weight': weight, 'style': style, 'url': f"{FONT_OUTPUT_URL}/{filename}"})
+                    print(f"  {os.path.basename(source)}: {os.path.getsize(source):,} → {len(data):,} bytes ({len(text)} characters)")
+                save_state(FONTS_STATE_PATH, FONTS_STATE_VERSION, 'fonts', {'inputs': inputs, 'faces': self.font_faces})
+
+        current = {face['url'].rsplit('/', 1)[-1] for face in self.font_faces}
+        if os.path.isdir(FONT_OUTPUT_DIR):
+            for filename in os.listdir(FONT_OUTPUT_DIR):
+                if filename.endswith('.woff2') and filename not in current:
+                    self.remove_output(os.path.join(FONT_OUTPUT_DIR, filename))
+        self.font_html = font_head(self.font_faces)
+
+    def apply_fonts(self, soup):
+        """Replace a hand-written page's font links with the generated font head."""
+        if not soup.head: return
+        def is_font_tag(tag):
+            if tag.name == 'link': return tag.get('href', '').startswith((GOOGLE_FONTS_CSS, GOOGLE_FONTS_FILES, FONT_OUTPUT_URL + '/'))
+            if tag.name == 'style': return tag.has_attr('data-fonts')
+            return tag.find('link', href=lambda x: x and x.startswith(GOOGLE_FONTS_CSS)) is not None
+        found = [tag for tag in soup.head.find_all(['link', 'style', 'noscript']) if tag.parent.name != 'noscript' and is_font_tag(tag)]
+        if not found: return
+        for tag in list(parse_fragment(self.font_html).children): found[0].insert_before(tag)
+        for tag in found: tag.decompose()
+
+    def strip_prefetch(self, soup):
+        for script in soup.find_all('script'):
+            if script.get('type') == 'speculationrules' or script.has_attr('data-prefetch'): script.decompose()
+
+    def apply_prefetch(self, soup, urls):
+        """Replace a hand-written page's prefetch hints with ones for `urls`."""
+        if not soup.head: return
+        self.strip_prefetch(soup)
+        for tag in list(parse_fragment(prefetch_head(urls)).children): soup.head.append(tag)
+
+    def apply_service_worker(self, soup):
+        if not soup.head: return
+        for script in soup.find_all('script', attrs={'data-sw': True}): script.decompose()
+        for tag in list(parse_fragment(service_worker.REGISTER).children): soup.head.append(tag)
+
+    def page_candidates(self, soup):
+        classes = {c for tag in soup.find_all(class_=True) for c in tag['class']}
+        return classes | tailwind.source_candidates('\n'.join(script.string or '' for script in soup.find_all('script', src=False)))
+
+    def apply_stylesheet(self, soup):
+        """Point a hand-written page's head at the compiled stylesheet, or back at the CDN when there is none."""
+        cdn = soup.find_all('script', src=TAILWIND_CDN) + [script for script in soup.find_all('script') if script.string and 'tailwind.config' in script.string]
+        compiled = soup.find_all('link', rel='stylesheet', href=lambda x: x and re.fullmatch(re.escape(ASSETS_URL) + r'/tailwind\.[0-9a-f]{12}\.css', x))
+        if self.stylesheet:
+            if not cdn and [link['href'] for link in compiled] == [self.stylesheet]: return
+            markup = f'<link href="{escape(self.stylesheet)}" rel="stylesheet"/>'
+        else:
+            if not compiled: return
+            markup = f'<script src="{TAILWIND_CDN}"></script><script>{TAILWIND_CONFIG}</script>'
+        found = cdn + compiled
+        if not found: return
+        # The replacement goes where the first of the old tags was.
+        anchor = next(tag for tag in soup.find_all(['script', 'link']) if any(tag is old for old in found))
+        for tag in list(parse_fragment(markup).children): anchor.insert_before(tag)
+        for tag in found: tag.decompose()
+
+    def update_related(self):
+        self.posts_by_url = {post['url']: post for post in self.posts_metadata}
+        if not self.related_index:
+            print("  NumPy not installed; recommending the newest posts.")
+            return
+        urls = [post['url'] for post in self.posts_metadata]
+        recomputed = self.related_index.update(urls, self.post_terms, self.post_term_digests)
+        if recomputed: print(f"  Recomputed related posts for {recomputed}/{len(urls)} posts.")
+        self.related = self.related_index.neighbours
+
+    def compute_inputs(self):
+        # Any change to the build code or the style registry invalidates every output.
+        modules = (sys.modules[__name__], fonts, output, parsing, related, search, service_worker, sitemap, styles, tailwind)
+        self.inputs['builder'] = data_digest([file_digest(module.__file__) for module in modules] + [self.styles.digest])
+        self.inputs['chrome'] = self.layout.digest()
+        self.inputs['stylesheet'] = self.stylesheet or TAILWIND_CDN
+        self.inputs['fonts'] = data_digest(self.font_html)
+        self.inputs['assets'] = data_digest(self.fingerprints)
+        for post in self.posts_metadata:
+            self.inputs[post['url']] = data_digest({k: post[k] for k in ('title', 'description', 'date', 'url', 'image', 'style', 'category_name')})
+
+    def dependencies(self, *keys, posts=()):
+        deps = {key: self.inputs[key] for key in keys}
+        if posts:
+            for post in posts: deps[post['url']] = self.inputs[post['url']]
+            deps['order'] = [post['url'] for post in posts]
+        return deps
+
+    def is_up_to_date(self, path, deps):
+        if self.full or not self.manifest.is_fresh(path, deps): return False
+        self.manifest.keep(path)
+        return True
+
+    def extract_page_parts(self, soup):
+        keywords_tag = soup.find('meta', attrs={'name': 'keywords'})
+        # The post's own CSS, not the @font-face block PostLayout puts ahead of it.
+        style_tag = next((tag for tag in soup.find_all('style') if not tag.has_attr('data-fonts')), None)
+        main = soup.find('main')
+        return {
+            'keywords': keywords_tag['content'] if keywords_tag else None,
+            'style': style_tag.extract() if style_tag else None,
+            'main': main.extract() if main else None
         }
-        """
-        script_tag = new_soup.new_tag('script')
-        script_tag.string = tailwind_config
-        head.append(script_tag)
-        style_tag = original_soup.find('style')
-        if style_tag: head.append(style_tag)
 
-        # Schema
-        schema_data = {
-            "@context": "https://schema.org", "@type": "BlogPosting",
-            "headline": post['title'], "description": post['description'], "datePublished": post['date'],
-            "author": { "@type": "Organization", "name": "ClaudeMai" }
+    def load_page_parts(self, file_path):
+        parts = self.page_parts.pop(file_path, None)
+        if parts is None:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                parts = self.extract_page_parts(parse_html(f.read()))
+        return parts
+
+    def release_page_parts(self, parts):
+        # Trees link parents and children both ways, so free them now rather than at the next GC cycle.
+        for tag in (parts or {}).values():
+            if hasattr(tag, 'decompose'): tag.decompose()
+
+    def shared_state(self):
+        # The layout is plain strings, so workers share the chrome without any live Tags.
+        return {
+            'layout': self.layout,
+            'posts_metadata': self.posts_metadata,
+            'related': self.related,
+            'parser': parsing.PARSER
         }
-        schema_script = new_soup.new_tag('script', type='application/ld+json')
-        schema_script.string = json.dumps(schema_data, ensure_ascii=False)
-        head.append(schema_script)
 
-        body = new_soup.new_tag('body', attrs={'class': 'bg-slate-50 text-slate-900 font-sans antialiased selection:bg-claude-600 selection:text-white'})
-        html.append(body)
+    @classmethod
+    def from_shared_state(cls, state):
+        """A builder that can only reconstruct_page(): __init__ would load the manifest, caches and indexes from disk for nothing."""
+        parsing.set_parser(state['parser'])
+        builder = cls.__new__(cls)
+        builder.page_parts = {}
+        builder.layout = state['layout']
+        builder.posts_metadata = state['posts_metadata']
+        builder.posts_by_url = {post['url']: post for post in builder.posts_metadata}
+        builder.related = state['related']
+        return builder
 
-        if self.assets['nav']: body.append(self.assets['nav'])
+    def process_blog_posts(self):
+        pending = []
+        for post in self.posts_metadata:
+            deps = self.dependencies('builder', 'chrome', post['url'], posts=self.recommend(post['url']))
+            if self.is_up_to_date(post['file_path'], deps):
+                self.release_page_parts(self.page_parts.pop(post['file_path'], None))
+                continue
+            pending.append((post, deps))
 
-        original_main = original_soup.find('main')
-        if original_main:
-            self.process_links(original_main)
-            
-            # Sync visual date with metadata date
-            time_tag = original_main.find('time', itemprop='datePublished')
-            if time_tag:
-                time_tag['datetime'] = post['date']
-                time_tag.string = post['date']
+        if self.jobs > 1 and len(pending) > 1:
+            print(f"  Reconstructing {len(pending)} posts with {self.jobs} workers...")
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker, initargs=(self.shared_state(),)) as executor:
+                # map() yields in submission order, so logging and the manifest stay deterministic.
+                results = executor.map(_reconstruct_worker, [post for post, _ in pending])
+                for (post, deps), (changed, seconds) in zip(pending, results):
+                    print(f"  Processed {post['filename']}")
+                    self.report_write(post['file_path'], changed)
+                    self.record_post(post, deps, seconds)
+        else:
+            for post, deps in pending:
+                print(f"  Processing {post['filename']}...")
+                changed, seconds = self.timed_reconstruct(post)
+                self.report_write(post['file_path'], changed)
+                self.record_post(post, deps, seconds)
+        print(f"  Rebuilt {len(pending)}/{len(self.posts_metadata)} posts ({len(self.posts_metadata) - len(pending)} up to date).")
+
+    def record_post(self, post, deps, seconds):
+        self.manifest.record(post['file_path'], deps)
+        if self.profiler: self.profiler.page(state_key(post['file_path']), seconds)
+        # Saves re-parsing every page we just rewrote on the next build.
+        fields = dict(PostLayout.extracted_fields(post), terms=self.post_terms[post['url']], terms_digest=self.post_term_digests[post['url']], classes=self.post_classes[post['url']], glyphs=self.post_glyphs[post['url']], content=self.post_content[post['url']])
+        self.metadata_cache.rekey(post['file_path'], fields)
+
+    def timed_reconstruct(self, post):
+        """reconstruct_page() plus the seconds it took, for --profile."""
+        start = time.perf_counter()
+        changed = self.reconstruct_page(post)
+        return changed, time.perf_counter() - start
 
+    def sync_main(self, main, date):
+        self.process_links(main)
+        # Sync visual date with metadata date
+        time_tag = main.find('time', itemprop='datePublished')
+        if time_tag:
+            time_tag['datetime'] = date
+            time_tag.string = date
+
+    def reconstruct_page(self, post):
+        file_path = post['file_path']
+        parts = self.load_page_parts(file_path)
+        keywords = parts['keywords'] if parts['keywords'] is not None else "Claude, Claude AI"
+
+        original_main = parts['main']
+        if original_main:
+            self.sync_main(original_main, post['date'])
             article = original_main.find('article')
             if article:
-                for div in article.find_all('div', class_='mt-12 pt-8 border-t border-slate-200'):
-                    if div.find('h3', string=re.compile('推荐阅读')): div.decompose()
+                self.strip_recommendations(article)
+                # The block goes right after the last content, whatever whitespace the source had there.
+                while article.contents and isinstance(article.contents[-1], str) and not article.contents[-1].strip():
+                    article.contents[-1].extract()
                 recommendation_html = self.generate_recommendations(current_post_url=post['url'])
-                article.append(BeautifulSoup(recommendation_html, 'html.parser'))
-            body.append(original_main)
-        else: body.append(new_soup.new_tag('main'))
+                article.append(parse_fragment(recommendation_html))
+            main_html = str(original_main)
+        else: main_html = '<main></main>'
+        style_html = str(parts['style']) if parts['style'] else ''
+        self.release_page_parts(parts)
 
-        if self.assets['footer']: body.append(self.assets['footer'])
+        # The 推荐阅读 cards are the likeliest next click.
+        prefetch_urls = [rec['url'] for rec in self.recommend(post['url'])]
+        page = self.layout.render(post, keywords, style_html, main_html, prefetch_urls)
+        return self.write_page(file_path, page)
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(str(new_soup.prettify()))
+    def serialize(self, soup):
+        return str(soup.prettify())
+
+    def write_page(self, path, markup):
+        """Write an HTML page unless it is unchanged. Returns True if the file changed."""
+        return write_if_changed(path, markup.encode('utf-8'))
+
+    def remove_output(self, path):
+        os.remove(path)
+        self.changed.append(path)
+
+    def report_write(self, path, changed):
+        if changed: self.changed.append(path)
+
+    def recommend(self, current_post_url):
+        related = [self.posts_by_url[url] for url in self.related.get(current_post_url, []) if url in self.posts_by_url]
+        # Fill up with the newest posts when fewer than three are similar enough.
+        taken = {current_post_url} | {p['url'] for p in related}
+        candidates = [p for p in self.posts_metadata if p['url'] not in taken]
+        return (related + candidates)[:3]
+
+    def strip_recommendations(self, article):
+        for div in article.find_all('div', class_='mt-12 pt-8 border-t border-slate-200'):
+            if not div.find('h3', string=re.compile('推荐阅读')): continue
+            # The indentation before the block goes with it, so a rebuilt page comes out byte for byte the same.
+            while isinstance(div.previous_sibling, str) and not div.previous_sibling.strip():
+                div.previous_sibling.extract()
+            div.decompose()
 
     def generate_recommendations(self, current_post_url):
-        candidates = [p for p in self.posts_metadata if p['url'] != current_post_url]
-        recommendations = candidates[:3]
+        recommendations = self.recommend(current_post_url)
         if not recommendations: return ""
         html = """<div class="mt-12 pt-8 border-t border-slate-200"><h3 class="text-xl font-bold text-slate-900 mb-6">推荐阅读</h3><div class="grid grid-cols-1 md:grid-cols-3 gap-6">"""
         for rec in recommendations:
@@ -340,81 +1176,55 @@ class SiteBuilder:
         html += "</div></div>"
         return html
 
-    def determine_post_style(self, title, filename=""):
-        title = title.lower()
-        if filename:
-            if 'academic' in filename: return {"icon": "🎓", "bg_gradient": "from-purple-100 to-purple-50", "text_color": "text-purple-600", "badge_color": "bg-purple-50 text-purple-600 border-purple-100", "badge_text": "学术科研"}
-            if 'usage' in filename or 'trouble' in filename: return {"icon": "🛡️", "bg_gradient": "from-red-100 to-red-50", "text_color": "text-red-600", "badge_color": "bg-red-50 text-red-600 border-red-100", "badge_text": "避坑指南"}
-            if 'vs' in filename: return {"icon": "⚖️", "bg_gradient": "from-teal-100 to-teal-50", "text_color": "text-teal-600", "badge_color": "bg-teal-50 text-teal-600 border-teal-100", "badge_text": "深度评测"}
-            if 'buy' in filename: return {"icon": "💳", "bg_gradient": "from-indigo-100 to-indigo-50", "text_color": "text-indigo-600", "badge_color": "bg-indigo-50 text-indigo-600 border-indigo-100", "badge_text": "购买指南"}
-            if 'register' in filename: return {"icon": "🆔", "bg_gradient": "from-emerald-100 to-emerald-50", "text_color": "text-emerald-600", "badge_color": "bg-emerald-50 text-emerald-600 border-emerald-100", "badge_text": "注册教程"}
-            if 'how-to' in filename: return {"icon": "🧭", "bg_gradient": "from-amber-100 to-amber-50", "text_color": "text-amber-600", "badge_color": "bg-amber-50 text-amber-600 border-amber-100", "badge_text": "新手必读"}
-            if 'opus' in filename: return {"icon": "🧠", "bg_gradient": "from-purple-100 to-purple-50", "text_color": "text-purple-600", "badge_color": "bg-purple-50 text-purple-600 border-purple-100", "badge_text": "旗舰模型"}
-            elif 'what-is-claude-skills' in filename:
-                return {
-                    "icon": "🧩", 
-                    "bg_gradient": "from-indigo-100 to-indigo-50",
-                    "text_color": "text-indigo-600",
-                    "badge_color": "bg-indigo-50 text-indigo-600 border-indigo-100",
-                    "badge_text": "前沿技术"
-                }
-            elif 'what-is-claude-agent' in filename:
-                return {
-                    "icon": "🕵️", 
-                    "bg_gradient": "from-slate-100 to-slate-50",
-                    "text_color": "text-slate-600",
-                    "badge_color": "bg-slate-50 text-slate-600 border-slate-100",
-                    "badge_text": "前沿技术"
-                }
-            if 'code' in filename: return {"icon": "⚡", "bg_gradient": "from-sky-100 to-sky-50", "text_color": "text-sky-600", "badge_color": "bg-sky-50 text-sky-600 border-sky-100", "badge_text": "效率工具"}
-            if 'what-is-claude-for-excel' in filename: return {"icon": "📊", "bg_gradient": "from-green-100 to-green-50", "text_color": "text-green-600", "badge_color": "bg-green-50 text-green-600 border-green-100", "badge_text": "效率工具"}
-            if 'what-is' in filename: return {"icon": "🤖", "bg_gradient": "from-orange-100 to-orange-50", "text_color": "text-orange-600", "badge_color": "bg-orange-50 text-orange-600 border-orange-100", "badge_text": "入门指南"}
-
-        style = {"icon": "📄", "bg_gradient": "from-gray-100 to-gray-50", "text_color": "text-gray-600", "badge_color": "bg-gray-100 text-gray-600 border-gray-100", "badge_text": "资讯"}
-        if any(k in title for k in ['封号', '限制', '解封', '安全']): style.update({"icon": "🛡️", "bg_gradient": "from-red-100 to-red-50", "text_color": "text-red-600", "badge_color": "bg-red-50 text-red-600 border-red-100", "badge_text": "避坑指南"})
-        elif any(k in title for k in ['code', '代码', '编程']): style.update({"icon": "💻", "bg_gradient": "from-blue-100 to-blue-50", "text_color": "text-blue-600", "badge_color": "bg-blue-50 text-blue-600 border-blue-100", "badge_text": "编程开发"})
-        return style
+    def homepage_grid(self, soup):
+        blog_section = soup.find(id='blog')
+        return blog_section.find('div', class_=lambda x: x and 'grid-cols-1' in x and 'md:grid-cols-3' in x) if blog_section else None
 
     def update_homepage(self):
         if not os.path.exists(INDEX_PATH): return
-        with open(INDEX_PATH, 'r', encoding='utf-8') as f: soup = BeautifulSoup(f.read(), 'html.parser')
-        blog_section = soup.find(id='blog')
-        if not blog_section: return
-        grid_container = blog_section.find('div', class_=lambda x: x and 'grid-cols-1' in x and 'md:grid-cols-3' in x)
+        with open(INDEX_PATH, 'r', encoding='utf-8') as f: soup = parse_html(f.read())
+        grid_container = self.homepage_grid(soup)
         if not grid_container: return
+        latest_posts = self.posts_metadata[:3]
+        deps = self.dependencies('builder', 'stylesheet', 'fonts', 'assets', posts=latest_posts)
+        if self.is_up_to_date(INDEX_PATH, deps):
+            print("  Homepage is up to date.")
+            return
         grid_container.clear()
         
-        latest_posts = self.posts_metadata[:3]
         for post in latest_posts:
             style = post['style']
             card_html = f"""<a href="{post['url']}" class="group bg-white rounded-2xl shadow-sm border border-slate-200 overflow-hidden hover:shadow-xl hover:-translate-y-1 transition-all duration-300"><div class="h-48 bg-gradient-to-br {style['bg_gradient']} flex items-center justify-center relative overflow-hidden"><div class="absolute inset-0 opacity-10 bg-[url('https://www.transparenttextures.com/patterns/cubes.png')]"></div><div class="text-6xl transform group-hover:scale-110 transition-transform duration-300 drop-shadow-sm">{style['icon']}</div></div><div class="p-6"><div class="flex items-center gap-2 mb-3"><span class="px-2.5 py-0.5 rounded-full {style['badge_color']} text-xs font-bold border">{style['badge_text']}</span><span class="text-slate-400 text-xs">{post['date']}</span></div><h3 class="text-xl font-bold text-slate-900 mb-3 group-hover:text-claude-600 transition-colors line-clamp-2">{post['title']}</h3><p class="text-slate-600 text-sm line-clamp-3 mb-4">{post['description']}</p><div class="flex items-center text-claude-600 text-sm font-semibold group-hover:underline decoration-2 underline-offset-2">阅读全文 <svg class="w-4 h-4 ml-1 transform group-hover:translate-x-1 transition-transform" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M17 8l4 4m0 0l-4 4m4-4H3"></path></svg></div></div></a>"""
-            grid_container.append(BeautifulSoup(card_html, 'html.parser'))
+            grid_container.append(parse_fragment(card_html))
+        self.apply_stylesheet(soup)
+        self.apply_fonts(soup)
+        self.fingerprint_refs(soup)
+        self.apply_prefetch(soup, [post['url'] for post in latest_posts])
+        self.apply_service_worker(soup)
         self.process_links(soup)
-        with open(INDEX_PATH, 'w', encoding='utf-8') as f: f.write(str(soup.prettify()))
+        self.report_write(INDEX_PATH, self.write_page(INDEX_PATH, self.serialize(soup)))
+        self.manifest.record(INDEX_PATH, deps)
+        # Only the blog grid changed, so the extracted nav/footer still match the new file.
+        if self.assets_digest: self.assets_digest = data_digest([self.manifest.updated[state_key(INDEX_PATH)]['hash'], self.fingerprints])
 
     def process_blog_index_spa(self):
         blog_index_path = os.path.join(BLOG_DIR, 'index.html')
         if not os.path.exists(blog_index_path): return
+        index_url = self.write_post_index()
+        # The SPA's first fetches; the service worker precaches them.
+        self.post_index_urls = [index_url, self.listing_shards['all'][0]] if self.listing_shards['all'] else [index_url]
+        # Everything the page shows comes from the index, so its hashed URL stands in for the posts.
+        deps = self.dependencies('builder', 'stylesheet', 'fonts', 'assets')
+        deps['post_index'] = index_url
+        if self.is_up_to_date(blog_index_path, deps):
+            print("  Blog index is up to date.")
+            return
 
-        with open(blog_index_path, 'r', encoding='utf-8') as f:
-            soup = BeautifulSoup(f.read(), 'html.parser')
-
-        # 0. Clean up existing injected scripts (Prevent duplication)
-        for s in soup.find_all('script'):
-            if s.string and 'const POSTS =' in s.string:
-                s.decompose()
-
-        # 1. Clean up existing static content & scripts
-        article_container = soup.find('div', class_=lambda x: x and 'lg:col-span-8' in x and 'space-y-8' in x)
-        if article_container: article_container.clear()
-        
-        # Remove old SPA scripts to prevent duplication
-        for script in soup.find_all('script'):
-            if script.string and ('const POSTS =' in script.string or 'const CATEGORIES =' in script.string):
-                script.decompose()
+        soup, article_container = self.load_blog_index(blog_index_path)
 
-        # 2. Inject Search & Filter UI
-        ui_html = """
+        # 2. Inject Search & Filter UI, with page 1 of all posts already rendered; the script takes over from there
+        pages = max(1, math.ceil(len(self.posts_metadata) / POSTS_PER_PAGE))
+        ui_html = f"""
         <div class="space-y-6 mb-8">
             <!-- Search -->
             <div class="relative">
@@ -422,77 +1232,195 @@ class SiteBuilder:
                 <svg class="w-5 h-5 text-slate-400 absolute left-3 top-3.5" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M21 21l-6-6m2-5a7 7 0 11-14 0 7 7 0 0114 0z"></path></svg>
             </div>
             <!-- Categories -->
-            <div class="flex flex-wrap gap-2 overflow-x-auto pb-2 scrollbar-hide" id="categoryContainer">
-                <!-- Injected by JS -->
-            </div>
+            <div class="flex flex-wrap gap-2 overflow-x-auto pb-2 scrollbar-hide" id="categoryContainer">{self.render_category_links('all')}</div>
         </div>
         <!-- Posts Container -->
-        <div id="postsContainer" class="space-y-6 min-h-[400px]">
-            <!-- Injected by JS -->
-        </div>
+        <div id="postsContainer" class="space-y-6 min-h-[400px]">{''.join(self.render_post_card(post) for post in self.posts_metadata[:POSTS_PER_PAGE])}</div>
         <!-- Pagination -->
-        <div id="paginationContainer" class="flex justify-center items-center gap-2 pt-8 border-t border-slate-200 mt-8">
-            <!-- Injected by JS -->
-        </div>
+        <div id="paginationContainer" class="flex justify-center items-center gap-2 pt-8 border-t border-slate-200 mt-8">{self.render_pagination_links('all', 1, pages)}</div>
         """
-        
-        # Generate static fallback for SEO/No-JS
-        noscript_html = '<noscript><div class="prose max-w-none mt-8"><h2>所有文章</h2><ul class="space-y-2">'
-        for post in self.posts_metadata:
-            noscript_html += f'<li><a href="{post["url"]}" class="text-claude-600 hover:underline">{post["title"]}</a> <span class="text-slate-400 text-sm">({post["date"]})</span></li>'
-        noscript_html += '</ul></div></noscript>'
 
         if article_container:
-            article_container.append(BeautifulSoup(ui_html + noscript_html, 'html.parser'))
-
-        # 3. Clean sidebar (Remove static categories)
-        self.update_sidebar(soup)
+            article_container.append(parse_fragment(ui_html))
 
         # 4. Inject Data & Logic
-        # Prepare data
-        categories_list = [{'slug': 'all', 'name': '全部', 'count': len(self.posts_metadata)}]
-        sorted_cats = sorted(self.categories.items(), key=lambda x: len(x[1]['posts']), reverse=True)
-        for slug, data in sorted_cats:
-            categories_list.append({'slug': slug, 'name': data['name'], 'count': len(data['posts'])})
-
-        # Serialize data
-        posts_json = json.dumps(self.posts_metadata, ensure_ascii=False)
-        cats_json = json.dumps(categories_list, ensure_ascii=False)
+        # The manifest is fetched first thing, so start downloading it with the HTML.
+        preload = soup.new_tag('link', rel='preload', href=index_url, attrs={'as': 'fetch', 'crossorigin': ''})
+        if soup.head: soup.head.append(preload)
+        # Cards the script renders later are covered by the hover rule.
+        self.apply_prefetch(soup, [post['url'] for post in self.posts_metadata[:PREFETCH_LIMIT]])
 
         # JS Logic
         script_content = f"""
-        const POSTS = {posts_json};
-        const CATEGORIES = {cats_json};
+        const POST_INDEX = '{index_url}';
         const POSTS_PER_PAGE = {POSTS_PER_PAGE};
+        const PAGINATION_RADIUS = {PAGINATION_RADIUS};
+        const SEARCH_DEBOUNCE_MS = {SEARCH_DEBOUNCE_MS};
+        const LATIN_RE = new RegExp({json.dumps(related.LATIN_PATTERN)}, 'g');
+        const CJK_RUN_RE = new RegExp({json.dumps(related.CJK_RUN_PATTERN)}, 'g');
+        // Most index terms a single query token may expand to while it is still being typed.
+        const SEARCH_EXPANSIONS = 50;
         
         let state = {{
             category: 'all',
             page: 1,
             search: ''
         }};
+        let index = null;
+        let ready = null;
+        const listings = {{}};
+        const shards = new Map();
+        let searchIndex = null;
+        let renderToken = 0;
+        let searchTimer = null;
+        const cards = new Map(); // post url -> card element, reused across renders
 
         // Init
         document.addEventListener('DOMContentLoaded', () => {{
             // Restore state from URL
             const params = new URLSearchParams(window.location.search);
             if(params.has('category')) state.category = params.get('category');
-            if(params.has('page')) state.page = parseInt(params.get('page'));
+            if(params.has('page')) state.page = parseInt(params.get('page')) || 1;
             if(params.has('search')) state.search = params.get('search');
             
             document.getElementById('searchInput').value = state.search;
+            // Adopt the pre-rendered cards so later renders can reuse them.
+            document.querySelectorAll('#postsContainer article[data-url]').forEach(card => cards.set(card.dataset.url, card));
             
-            render();
+            ready = loadJSON(POST_INDEX).then(data => {{
+                index = data;
+                index.categories.forEach(cat => listings[cat.slug] = cat);
+                if (!listings[state.category]) state.category = 'all';
+            }});
+            // Page 1 of all posts is pre-rendered into the HTML; any other view is rendered here.
+            if (state.category !== 'all' || state.page !== 1 || state.search) render();
             
-            // Listeners
+            // Listeners: category and page links work without JS, so they are only intercepted here
+            document.getElementById('categoryContainer').addEventListener('click', (e) => {{
+                const link = e.target.closest('[data-category]');
+                if (!link) return;
+                e.preventDefault();
+                setCategory(link.dataset.category);
+            }});
+            document.getElementById('paginationContainer').addEventListener('click', (e) => {{
+                const link = e.target.closest('[data-page]');
+                if (!link) return;
+                e.preventDefault();
+                setPage(parseInt(link.dataset.page));
+            }});
+            document.getElementById('searchInput').addEventListener('focus', loadSearchIndex, {{ once: true }});
             document.getElementById('searchInput').addEventListener('input', (e) => {{
-                state.search = e.target.value.toLowerCase();
-                state.page = 1;
-                updateURL();
-                render();
+                // Search once typing pauses, and keep the history to one entry per search.
+                clearTimeout(searchTimer);
+                searchTimer = setTimeout(() => {{
+                    state.search = e.target.value.toLowerCase();
+                    state.page = 1;
+                    updateURL(true);
+                    render();
+                }}, SEARCH_DEBOUNCE_MS);
             }});
         }});
 
-        function updateURL() {{
+        function loadJSON(url) {{
+            // Each file is fetched once per visit; hashed names let the HTTP cache keep them across visits.
+            if (!shards.has(url)) shards.set(url, fetch(url).then(r => r.json()));
+            return shards.get(url);
+        }}
+
+        function toPost(record) {{
+            const post = {{}};
+            index.fields.forEach((field, i) => post[field] = record[i]);
+            post.url = '/blog/' + post.slug;
+            post.style = index.styles[post.style];
+            post.category_name = post.style.badge_text;
+            return post;
+        }}
+
+        async function loadPosts(listing, from, to) {{
+            // Only the shards covering posts [from, to) of the listing are fetched.
+            const first = Math.floor(from / index.shard_size);
+            const last = Math.ceil(Math.min(to, listing.count) / index.shard_size);
+            const records = (await Promise.all(listing.shards.slice(first, last).map(loadJSON))).flat();
+            const offset = first * index.shard_size;
+            return records.slice(from - offset, to - offset).map(toPost);
+        }}
+
+        async function loadDocs(ids) {{
+            // Search hits are positions in the 'all' listing.
+            const all = listings.all;
+            const loaded = await Promise.all(ids.map(id => loadJSON(all.shards[Math.floor(id / index.shard_size)])));
+            return ids.map((id, i) => toPost(loaded[i][id % index.shard_size]));
+        }}
+
+        function tokenize(text) {{
+            // Mirrors related.tokenize: Latin words plus overlapping CJK bigrams.
+            text = text.toLowerCase();
+            const tokens = text.match(LATIN_RE) || [];
+            for (const run of text.match(CJK_RUN_RE) || []) {{
+                if (run.length === 1) tokens.push(run);
+                else for (let i = 0; i < run.length - 1; i++) tokens.push(run.slice(i, i + 2));
+            }}
+            return [...new Set(tokens)];
+        }}
+
+        function loadSearchIndex() {{
+            if (!searchIndex) searchIndex = ready.then(() => loadJSON(index.search)).then(data => {{
+                // Undo the front coding once; posting lists are decoded per lookup.
+                const terms = [];
+                let previous = '';
+                for (let i = 0; i < data.terms.length; i += 2) {{
+                    previous = previous.slice(0, data.terms[i]) + data.terms[i + 1];
+                    terms.push(previous);
+                }}
+                return {{ ...data, terms }};
+            }});
+            return searchIndex;
+        }}
+
+        function lowerBound(terms, key) {{
+            let lo = 0, hi = terms.length;
+            while (lo < hi) {{
+                const mid = (lo + hi) >> 1;
+                if (terms[mid] < key) lo = mid + 1; else hi = mid;
+            }}
+            return lo;
+        }}
+
+        async function searchPosts(query, category) {{
+            const idx = await loadSearchIndex();
+            const tokens = tokenize(query);
+            if (!tokens.length) return [];
+            let scores = null;
+            for (const token of tokens) {{
+                // The token itself scores in full; longer terms it prefixes (a word still being typed) at half.
+                const hits = new Map();
+                for (let t = lowerBound(idx.terms, token), n = 0; t < idx.terms.length && n < SEARCH_EXPANSIONS && idx.terms[t].startsWith(token); t++, n++) {{
+                    const postings = idx.postings[t];
+                    const idf = Math.log(1 + idx.docs / (postings.length / 2));
+                    const boost = idx.terms[t] === token ? 1 : 0.5;
+                    for (let i = 0, doc = 0; i < postings.length; i += 2) {{
+                        doc += postings[i];
+                        const score = boost * idf * (1 + Math.log(postings[i + 1]));
+                        if (score > (hits.get(doc) || 0)) hits.set(doc, score);
+                    }}
+                }}
+                // Every query token has to match.
+                if (scores === null) scores = hits;
+                else for (const [doc, score] of scores) {{
+                    if (hits.has(doc)) scores.set(doc, score + hits.get(doc));
+                    else scores.delete(doc);
+                }}
+                if (!scores.size) return [];
+            }}
+            const categoryId = index.categories.findIndex(cat => cat.slug === category);
+            // Best score first; ties go to the newer post.
+            return [...scores]
+                .filter(([doc]) => categoryId <= 0 || idx.categories[doc] === categoryId)
+                .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+                .map(([doc]) => doc);
+        }}
+
+        function updateURL(replace = false) {{
             const url = new URL(window.location);
             if(state.category !== 'all') url.searchParams.set('category', state.category);
             else url.searchParams.delete('category');
@@ -503,7 +1431,8 @@ class SiteBuilder:
             if(state.search) url.searchParams.set('search', state.search);
             else url.searchParams.delete('search');
             
-            window.history.pushState({{}}, '', url);
+            if (replace) window.history.replaceState({{}}, '', url);
+            else window.history.pushState({{}}, '', url);
         }}
 
         function setCategory(slug) {{
@@ -520,40 +1449,56 @@ class SiteBuilder:
             window.scrollTo({{ top: 0, behavior: 'smooth' }});
         }}
 
-        function render() {{
+        function listingUrl(slug, page) {{
+            // Mirrors SiteBuilder.listing_url, so links stay valid without JS.
+            const base = slug === 'all' ? '/blog/' : `/blog/category/${{slug}}/`;
+            return page > 1 ? `${{base}}page/${{page}}/` : base;
+        }}
+
+        async function render() {{
+            const token = ++renderToken;
+            await ready;
             renderCategories();
+            const listing = listings[state.category];
             
-            // Filter
-            let filtered = POSTS.filter(p => {{
-                const matchCat = state.category === 'all' || p.category_slug === state.category;
-                const matchSearch = !state.search || 
-                    p.title.toLowerCase().includes(state.search) || 
-                    p.description.toLowerCase().includes(state.search);
-                return matchCat && matchSearch;
-            }});
+            // Filter: a search ranks hits from the index, browsing just walks the listing
+            const hits = state.search ? await searchPosts(state.search, state.category) : null;
+            const total = hits ? hits.length : listing.count;
             
             // Paginate
-            const totalPages = Math.ceil(filtered.length / POSTS_PER_PAGE) || 1;
+            const totalPages = Math.ceil(total / POSTS_PER_PAGE) || 1;
             if (state.page > totalPages) state.page = 1;
             
             const start = (state.page - 1) * POSTS_PER_PAGE;
             const end = start + POSTS_PER_PAGE;
-            const pagePosts = filtered.slice(start, end);
+            const pagePosts = hits ? await loadDocs(hits.slice(start, end)) : await loadPosts(listing, start, end);
+            // A newer render started while shards were loading.
+            if (token !== renderToken) return;
             
             renderPosts(pagePosts);
             renderPagination(state.page, totalPages);
         }}
 
         function renderCategories() {{
-            const container = document.getElementById('categoryContainer');
-            container.innerHTML = CATEGORIES.map(cat => {{
-                const isActive = cat.slug === state.category;
-                const baseClass = "px-4 py-2 rounded-full text-sm font-medium transition-colors border cursor-pointer whitespace-nowrap";
-                const activeClass = isActive ? "bg-slate-900 text-white border-slate-900" : "bg-white text-slate-600 border-slate-200 hover:border-slate-300 hover:text-slate-900";
-                return `<button onclick="setCategory('${{cat.slug}}')" class="${{baseClass}} ${{activeClass}}">
-                    ${{cat.name}}
-                </button>`;
-            }}).join('');
+            // The chips never change within a build, so only the active state is updated.
+            const baseClass = "px-4 py-2 rounded-full text-sm font-medium transition-colors border cursor-pointer whitespace-nowrap";
+            document.querySelectorAll('#categoryContainer [data-category]').forEach(link => {{
+                const isActive = link.dataset.category === state.category;
+                const className = `${{baseClass}} ${{isActive ? "bg-slate-900 text-white border-slate-900" : "bg-white text-slate-600 border-slate-200 hover:border-slate-300 hover:text-slate-900"}}`;
+                if (link.className !== className) link.className = className;
+            }});
+        }}
+
+        function escapeHTML(text) {{
+            return String(text).replace(/[&<>"']/g, c => ({{'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'}})[c]);
+        }}
+
+        function createCard(post) {{
+            // Same markup as SiteBuilder.render_post_card.
+            const style = post.style;
+            const template = document.createElement('template');
+            template.innerHTML = `<article data-url="${{post.url}}" class="group bg-white rounded-2xl border border-slate-200 shadow-sm hover:shadow-md transition-all overflow-hidden"><div class="flex flex-col sm:flex-row h-full"><div class="sm:w-64 h-48 sm:h-auto bg-gradient-to-br ${{style.bg_gradient}} flex items-center justify-center relative shrink-0 overflow-hidden"><div class="absolute inset-0 opacity-10 bg-[url('https://www.transparenttextures.com/patterns/cubes.png')]"></div><div class="text-6xl transform group-hover:scale-110 transition-transform duration-300 drop-shadow-sm">${{style.icon}}</div></div><div class="p-8 flex flex-col justify-center flex-1"><div class="flex items-center gap-3 text-sm text-slate-500 mb-3"><span class="px-2.5 py-0.5 rounded-full ${{style.badge_color}} text-xs font-bold border">${{escapeHTML(post.category_name)}}</span><span>${{post.date}}</span></div><h2 class="text-2xl font-bold text-slate-900 mb-3 group-hover:text-claude-600 transition-colors"><a href="${{post.url}}" class="hover:underline">${{escapeHTML(post.title)}}</a></h2><p class="text-slate-600 leading-relaxed mb-6 line-clamp-3">${{escapeHTML(post.description)}}</p><a href="${{post.url}}" class="inline-flex items-center text-sm font-semibold text-claude-600 hover:text-claude-700">阅读全文 <svg class="w-4 h-4 ml-1 group-hover:translate-x-1 transition-transform" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M17 8l4 4m0 0l-4 4m4-4H3"></path></svg></a></div></div></article>`;
+            return template.content.firstElementChild;
         }}
 
         function renderPosts(posts) {{
@@ -566,64 +1511,72 @@ class SiteBuilder:
                 return;
             }}
             
-            container.innerHTML = posts.map(post => {{
-                const style = post.style;
-                return `
-                <article class="group bg-white rounded-2xl border border-slate-200 shadow-sm hover:shadow-md transition-all overflow-hidden">
-                    <div class="flex flex-col sm:flex-row h-full">
-                        <div class="sm:w-64 h-48 sm:h-auto bg-gradient-to-br ${{style.bg_gradient}} flex items-center justify-center relative shrink-0 overflow-hidden">
-                             <div class="absolute inset-0 opacity-10 bg-[url('https://www.transparenttextures.com/patterns/cubes.png')]"></div>
-                             <div class="text-6xl transform group-hover:scale-110 transition-transform duration-300 drop-shadow-sm">${{style.icon}}</div>
-                        </div>
-                        <div class="p-8 flex flex-col justify-center flex-1">
-                             <div class="flex items-center gap-3 text-sm text-slate-500 mb-3">
-                                  <span class="px-2.5 py-0.5 rounded-full ${{style.badge_color}} text-xs font-bold border">${{post.category_name}}</span>
-                                  <span>${{post.date}}</span>
-                             </div>
-                             <h2 class="text-2xl font-bold text-slate-900 mb-3 group-hover:text-claude-600 transition-colors">
-                                  <a href="${{post.url}}" class="hover:underline">${{post.title}}</a>
-                             </h2>
-                             <p class="text-slate-600 leading-relaxed mb-6 line-clamp-3">
-                                  ${{post.description}}
-                             </p>
-                             <a href="${{post.url}}" class="inline-flex items-center text-sm font-semibold text-claude-600 hover:text-claude-700">
-                                  阅读全文 <svg class="w-4 h-4 ml-1 group-hover:translate-x-1 transition-transform" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M17 8l4 4m0 0l-4 4m4-4H3"></path></svg>
-                             </a>
-                        </div>
-                    </div>
-                </article>`;
-            }}).join('');
+            // Keyed patch: cards already in the DOM stay put, new posts get a card, and only out-of-place nodes move.
+            let cursor = container.firstElementChild;
+            for (const post of posts) {{
+                let card = cards.get(post.url);
+                if (!card) {{
+                    card = createCard(post);
+                    cards.set(post.url, card);
+                }}
+                if (card === cursor) cursor = cursor.nextElementSibling;
+                else container.insertBefore(card, cursor);
+            }}
+            while (cursor) {{
+                const next = cursor.nextElementSibling;
+                cursor.remove();
+                cursor = next;
+            }}
+        }}
+
+        function paginationWindow(current, total) {{
+            // Mirrors pagination_window in build.py: null marks a collapsed gap.
+            const pages = [1, total];
+            for (let i = Math.max(1, current - PAGINATION_RADIUS); i <= Math.min(total, current + PAGINATION_RADIUS); i++) pages.push(i);
+            const shown = [];
+            for (const i of [...new Set(pages)].sort((a, b) => a - b)) {{
+                if (shown.length && i - shown[shown.length - 1] > 1) shown.push(null);
+                shown.push(i);
+            }}
+            return shown;
         }}
 
         function renderPagination(current, total) {{
             const container = document.getElementById('paginationContainer');
+            const key = `${{state.category}}:${{current}}/${{total}}`;
+            if (container.dataset.key === key) return;
+            container.dataset.key = key;
             if (total <= 1) {{
                 container.innerHTML = '';
                 return;
             }}
             
+            const buttonClass = "px-4 py-2 text-sm font-medium text-slate-600 bg-white rounded-lg border border-slate-200 hover:bg-slate-50";
+            const disabledClass = "px-4 py-2 text-sm font-medium text-slate-400 bg-slate-50 rounded-lg border border-slate-200 cursor-not-allowed";
             let html = '';
             // Prev
             if (current > 1) {{
-                html += `<button onclick="setPage(${{current - 1}})" class="px-4 py-2 text-sm font-medium text-slate-600 bg-white rounded-lg border border-slate-200 hover:bg-slate-50">上一页</button>`;
+                html += `<a href="${{listingUrl(state.category, current - 1)}}" data-page="${{current - 1}}" rel="prev" class="${{buttonClass}}">上一页</a>`;
             }} else {{
-                html += `<span class="px-4 py-2 text-sm font-medium text-slate-400 bg-slate-50 rounded-lg border border-slate-200 cursor-not-allowed">上一页</span>`;
+                html += `<span class="${{disabledClass}}">上一页</span>`;
             }}
             
-            // Pages
-            for(let i=1; i<=total; i++) {{
-                if(i === current) {{
+            // Pages: a fixed-size window however many pages there are
+            for (const i of paginationWindow(current, total)) {{
+                if (i === null) {{
+                    html += `<span class="px-2 text-sm text-slate-400">…</span>`;
+                }} else if (i === current) {{
                     html += `<span class="px-4 py-2 text-sm font-medium text-white bg-claude-600 rounded-lg shadow-sm shadow-claude-600/30">${{i}}</span>`;
                 }} else {{
-                    html += `<button onclick="setPage(${{i}})" class="px-4 py-2 text-sm font-medium text-slate-600 bg-white rounded-lg border border-slate-200 hover:bg-slate-50">${{i}}</button>`;
+                    html += `<a href="${{listingUrl(state.category, i)}}" data-page="${{i}}" class="${{buttonClass}}">${{i}}</a>`;
                 }}
             }}
             
             // Next
             if (current < total) {{
-                html += `<button onclick="setPage(${{current + 1}})" class="px-4 py-2 text-sm font-medium text-slate-600 bg-white rounded-lg border border-slate-200 hover:bg-slate-50">下一页</button>`;
+                html += `<a href="${{listingUrl(state.category, current + 1)}}" data-page="${{current + 1}}" rel="next" class="${{buttonClass}}">下一页</a>`;
             }} else {{
-                html += `<span class="px-4 py-2 text-sm font-medium text-slate-400 bg-slate-50 rounded-lg border border-slate-200 cursor-not-allowed">下一页</span>`;
+                html += `<span class="${{disabledClass}}">下一页</span>`;
             }}
             
             container.innerHTML = html;
@@ -634,8 +1587,201 @@ class SiteBuilder:
         script_tag.string = script_content
         soup.body.append(script_tag)
 
-        with open(blog_index_path, 'w', encoding='utf-8') as f:
-            f.write(str(soup.prettify()))
+        self.report_write(blog_index_path, self.write_page(blog_index_path, self.serialize(soup)))
+        self.manifest.record(blog_index_path, deps)
+
+    def load_blog_index(self, path):
+        """Parse blog/index.html and strip everything process_blog_index_spa injects into it."""
+        with open(path, 'r', encoding='utf-8') as f:
+            soup = parse_html(f.read())
+
+        # 0. Clean up existing injected scripts and index preloads (Prevent duplication)
+        for script in soup.find_all('script'):
+            if script.string and ('const POSTS =' in script.string or 'const CATEGORIES =' in script.string or 'const POST_INDEX =' in script.string):
+                script.decompose()
+        for link in soup.find_all('link', rel='preload', href=lambda x: x and x.startswith(POST_INDEX_URL + '/')):
+            link.decompose()
+        self.strip_prefetch(soup)
+
+        # 1. Clean up existing static content
+        article_container = soup.find('div', class_=lambda x: x and 'lg:col-span-8' in x and 'space-y-8' in x)
+        if article_container: article_container.clear()
+
+        # 3. Clean sidebar (Remove static categories)
+        self.update_sidebar(soup)
+        self.apply_stylesheet(soup)
+        self.apply_fonts(soup)
+        self.fingerprint_refs(soup)
+        self.apply_service_worker(soup)
+        return soup, article_container
+
+    def listings(self):
+        """(slug, name, posts) for 'all' and then every category."""
+        return [('all', '全部', self.posts_metadata)] + [(slug, data['name'], data['posts']) for slug, data in self.sorted_categories()]
+
+    def listing_url(self, slug, page=1):
+        base = '/blog/' if slug == 'all' else f"/blog/category/{slug}/"
+        return base if page == 1 else f"{base}page/{page}/"
+
+    def render_category_links(self, active):
+        base_class = "px-4 py-2 rounded-full text-sm font-medium transition-colors border cursor-pointer whitespace-nowrap"
+        html = ''
+        for slug, name, _ in self.listings():
+            state_class = "bg-slate-900 text-white border-slate-900" if slug == active else "bg-white text-slate-600 border-slate-200 hover:border-slate-300 hover:text-slate-900"
+            html += f'<a href="{self.listing_url(slug)}" data-category="{slug}" class="{base_class} {state_class}">{escape(name)}</a>'
+        return html
+
+    def render_post_card(self, post):
+        style = post['style']
+        return f"""<article data-url="{post['url']}" class="group bg-white rounded-2xl border border-slate-200 shadow-sm hover:shadow-md transition-all overflow-hidden"><div class="flex flex-col sm:flex-row h-full"><div class="sm:w-64 h-48 sm:h-auto bg-gradient-to-br {style['bg_gradient']} flex items-center justify-center relative shrink-0 overflow-hidden"><div class="absolute inset-0 opacity-10 bg-[url('https://www.transparenttextures.com/patterns/cubes.png')]"></div><div class="text-6xl transform group-hover:scale-110 transition-transform duration-300 drop-shadow-sm">{style['icon']}</div></div><div class="p-8 flex flex-col justify-center flex-1"><div class="flex items-center gap-3 text-sm text-slate-500 mb-3"><span class="px-2.5 py-0.5 rounded-full {style['badge_color']} text-xs font-bold border">{escape(post['category_name'])}</span><span>{post['date']}</span></div><h2 class="text-2xl font-bold text-slate-900 mb-3 group-hover:text-claude-600 transition-colors"><a href="{post['url']}" class="hover:underline">{escape(post['title'])}</a></h2><p class="text-slate-600 leading-relaxed mb-6 line-clamp-3">{escape(post['description'])}</p><a href="{post['url']}" class="inline-flex items-center text-sm font-semibold text-claude-600 hover:text-claude-700">阅读全文 <svg class="w-4 h-4 ml-1 group-hover:translate-x-1 transition-transform" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M17 8l4 4m0 0l-4 4m4-4H3"></path></svg></a></div></div></article>"""
+
+    def render_pagination_links(self, slug, current, total):
+        if total <= 1: return ''
+        button_class = "px-4 py-2 text-sm font-medium text-slate-600 bg-white rounded-lg border border-slate-200 hover:bg-slate-50"
+        disabled_class = "px-4 py-2 text-sm font-medium text-slate-400 bg-slate-50 rounded-lg border border-slate-200 cursor-not-allowed"
+        html = f'<a href="{self.listing_url(slug, current - 1)}" data-page="{current - 1}" rel="prev" class="{button_class}">上一页</a>' if current > 1 else f'<span class="{disabled_class}">上一页</span>'
+        for page in pagination_window(current, total):
+            if page is None:
+                html += '<span class="px-2 text-sm text-slate-400">…</span>'
+            elif page == current:
+                html += f'<span class="px-4 py-2 text-sm font-medium text-white bg-claude-600 rounded-lg shadow-sm shadow-claude-600/30">{page}</span>'
+            else:
+                html += f'<a href="{self.listing_url(slug, page)}" data-page="{page}" class="{button_class}">{page}</a>'
+        html += f'<a href="{self.listing_url(slug, current + 1)}" data-page="{current + 1}" rel="next" class="{button_class}">下一页</a>' if current < total else f'<span class="{disabled_class}">下一页</span>'
+        return html
+
+    def render_listing(self, slug, page, pages, posts):
+        """Category links, one page of post cards and pagination, as plain links that need no JS.
+
+        The blog index pre-renders the same markup and its script intercepts the links via their data-* attributes.
+        """
+        return (
+            f'<div class="flex flex-wrap gap-2 overflow-x-auto pb-2 scrollbar-hide mb-8">{self.render_category_links(slug)}</div>'
+            f'<div class="space-y-6 min-h-[400px]">{"".join(self.render_post_card(post) for post in posts)}</div>'
+            f'<div class="flex justify-center items-center gap-2 pt-8 border-t border-slate-200 mt-8">{self.render_pagination_links(slug, page, pages)}</div>'
+        )
+
+    def generate_listing_pages(self):
+        blog_index_path = os.path.join(BLOG_DIR, 'index.html')
+        if not os.path.exists(blog_index_path): return
+        # The chrome comes from the blog index as just written; re-parse only when that file changed.
+        digest = file_digest(blog_index_path)
+        if digest != self.listing_source_digest:
+            soup, article_container = self.load_blog_index(blog_index_path)
+            self.listing_layout = ListingLayout(soup, article_container) if soup.head and article_container else None
+            self.listing_source_digest = digest
+            soup.decompose()
+        if not self.listing_layout:
+            print("  ⚠️ blog/index.html has no post list column; skipping listing pages.")
+            return
+        self.inputs['listing_chrome'] = self.listing_layout.digest()
+
+        listings = self.listings()
+        categories = [[slug, name] for slug, name, _ in listings]
+        pending, current = [], set()
+        for slug, name, posts in listings:
+            pages = max(1, math.ceil(len(posts) / POSTS_PER_PAGE))
+            for page in range(1, pages + 1):
+                # Page 1 of 'all' is the blog index itself.
+                if slug == 'all' and page == 1: continue
+                url = self.listing_url(slug, page)
+                path = os.path.join(ROOT_DIR, *url.strip('/').split('/'), 'index.html')
+                current.add(path)
+                page_posts = posts[(page - 1) * POSTS_PER_PAGE:page * POSTS_PER_PAGE]
+                deps = self.dependencies('builder', 'listing_chrome', posts=page_posts)
+                deps['listing'] = data_digest([slug, name, page, pages, len(posts), categories])
+                if self.is_up_to_date(path, deps): continue
+
+                page_label = f" - 第{page}页" if page > 1 else ''
+                if slug == 'all':
+                    title, heading = f"全部文章{page_label} | ClaudeMai", "全部文章"
+                    description = f"ClaudeMai 博客全部 {len(posts)} 篇 Claude 教程与资讯{page_label}。"
+                else:
+                    title, heading = f"{name}{page_label} - Claude 博客 | ClaudeMai", name
+                    description = f"ClaudeMai 博客「{name}」分类下的 {len(posts)} 篇 Claude 文章{page_label}。"
+                intro = f"共 {len(posts)} 篇文章" + (f"，第 {page} / {pages} 页" if pages > 1 else '')
+                prefetch_urls = [post['url'] for post in page_posts[:PREFETCH_LIMIT]]
+                markup = self.listing_layout.render(title, description, url, heading, intro, self.render_listing(slug, page, pages, page_posts), prefetch_urls)
+                pending.append((path, deps, markup))
+
+        def write(job):
+            path, _, markup = job
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            return self.write_page(path, markup)
+
+        # Rendering is plain string splicing; the writes are what is left, so they overlap.
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            for (path, deps, _), changed in zip(pending, executor.map(write, pending)):
+                self.report_write(path, changed)
+                self.manifest.record(path, deps)
+
+        removed = 0
+        for listing_dir in LISTING_DIRS:
+            for dirpath, _, filenames in os.walk(listing_dir, topdown=False):
+                for filename in filenames:
+                    path = os.path.join(dirpath, filename)
+                    if filename == 'index.html' and path not in current:
+                        self.remove_output(path)
+                        removed += 1
+                if not os.listdir(dirpath): os.rmdir(dirpath)
+        print(f"  Rebuilt {len(pending)}/{len(current)} listing pages" + (f", removed {removed} stale." if removed else '.'))
+
+    def sorted_categories(self):
+        # Largest first; ties keep the order the categories were first seen in.
+        return sorted(self.categories.items(), key=lambda x: len(x[1]['posts']), reverse=True)
+
+    def post_record(self, post):
+        return [post['url'].rsplit('/', 1)[-1], post['title'], post['description'], post['date'], post['style']['id']]
+
+    def write_post_index(self):
+        """Write the SPA's post data to blog/data as content-hashed JSON and return the manifest URL.
+
+        The manifest holds the categories, the styles in use, the shard URLs of every
+        listing ('all' plus one per category) and the URL of the search index. Each shard
+        holds POSTS_PER_SHARD compact records. Unchanged files keep their name, so they are
+        neither rewritten nor re-downloaded.
+        """
+        os.makedirs(POST_INDEX_DIR, exist_ok=True)
+        current = set()
+        self.listing_shards = {}
+        def emit(name, data):
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            filename = f"{name}.{hashlib.sha256(payload).hexdigest()[:12]}.json"
+            path = os.path.join(POST_INDEX_DIR, filename)
+            if write_if_changed(path, payload): self.changed.append(path)
+            current.add(filename)
+            return f"{POST_INDEX_URL}/{filename}"
+
+        listings = self.listings()
+        categories = []
+        category_ids = {slug: i for i, (slug, _, _) in enumerate(listings)}
+        for slug, name, posts in listings:
+            records = [self.post_record(post) for post in posts]
+            shards = [emit(f"{slug}-{i // POSTS_PER_SHARD}", records[i:i + POSTS_PER_SHARD]) for i in range(0, len(records), POSTS_PER_SHARD)]
+            categories.append({'slug': slug, 'name': name, 'count': len(posts), 'shards': shards})
+            self.listing_shards[slug] = shards
+
+        used = {post['style']['id']: post['style'] for post in self.posts_metadata}
+        styles = {style_id: {field: style[field] for field in POST_INDEX_STYLE_FIELDS} for style_id, style in sorted(used.items())}
+        # Search hits are 'all' listing positions; each doc's category lets the client filter them.
+        search_categories = [category_ids[post['category_slug']] for post in self.posts_metadata]
+        search_inputs = data_digest([self.inputs['builder'], [self.post_term_digests[post['url']] for post in self.posts_metadata], search_categories])
+        state = load_state(SEARCH_STATE_PATH, SEARCH_STATE_VERSION, 'index', "Search index state")
+        if state.get('inputs') == search_inputs and os.path.exists(os.path.join(POST_INDEX_DIR, state['filename'])):
+            # Same posts, terms and order: the index file on disk is still current.
+            current.add(state['filename'])
+            search_url = f"{POST_INDEX_URL}/{state['filename']}"
+        else:
+            search_index = search.build_index([self.post_terms[post['url']] for post in self.posts_metadata])
+            search_index['categories'] = search_categories
+            search_url = emit('search', search_index)
+            save_state(SEARCH_STATE_PATH, SEARCH_STATE_VERSION, 'index', {'inputs': search_inputs, 'filename': search_url.rsplit('/', 1)[1]})
+        index_url = emit('posts', {'fields': POST_INDEX_FIELDS, 'shard_size': POSTS_PER_SHARD, 'styles': styles, 'categories': categories, 'search': search_url})
+
+        for filename in os.listdir(POST_INDEX_DIR):
+            if filename.endswith('.json') and filename not in current:
+                self.remove_output(os.path.join(POST_INDEX_DIR, filename))
+        return index_url
 
     def update_sidebar(self, soup):
         aside = soup.find('aside')
@@ -650,78 +1796,222 @@ class SiteBuilder:
                     div.decompose()
                     continue
 
+    def write_deploy_copy(self):
+        """Mirror the site into DEPLOY_DIR with every page the build writes minified.
+
+        Files are copied again only when their size or mtime changed, or, for
+        pages, when the builder (and so the minifier) did.
+        """
+        previous = load_state(DEPLOY_STATE_PATH, DEPLOY_STATE_VERSION, 'files', "Deploy state")
+        ignore = shutil.ignore_patterns(*DEPLOY_IGNORE)
+        files, copied, before, after = {}, 0, 0, 0
+        for dirpath, dirnames, filenames in os.walk(ROOT_DIR):
+            skipped = ignore(dirpath, dirnames + filenames)
+            dirnames[:] = sorted(d for d in dirnames if d not in skipped)
+            for filename in sorted(filenames):
+                if filename in skipped: continue
+                path = os.path.join(dirpath, filename)
+                key = state_key(path)
+                # Precompressed siblings of the source pages; compress_outputs() writes the deploy copy's own.
+                if key.endswith(tuple(compress.ENCODERS)) and key not in self.manifest.outputs: continue
+                page = key.endswith('.html') and key in self.manifest.outputs
+                st = os.stat(path)
+                files[key] = [st.st_size, st.st_mtime_ns, self.inputs['builder'] if page else None]
+                target = os.path.join(DEPLOY_DIR, *key.split('/'))
+                if previous.get(key) == files[key] and os.path.exists(target): continue
+                with open(path, 'rb') as f: data = f.read()
+                if page:
+                    before += len(data)
+                    data = minify_html(data.decode('utf-8')).encode('utf-8')
+                    after += len(data)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if write_if_changed(target, data): self.changed.append(target)
+                copied += 1
+
+        for key in previous.keys() - files.keys():
+            target = os.path.join(DEPLOY_DIR, *key.split('/'))
+            if os.path.exists(target): self.remove_output(target)
+        save_state(DEPLOY_STATE_PATH, DEPLOY_STATE_VERSION, 'files', files)
+        saved = f"; minified pages {before:,} → {after:,} bytes ({(after - before) / before:+.0%})" if before else ''
+        print(f"  Copied {copied}/{len(files)} files{saved}.")
+
+    def compress_outputs(self):
+        """Write .gz (and, with brotli installed, .br) siblings for every HTML, XML and JSON output whose content changed since its siblings were written."""
+        previous = load_state(COMPRESSED_PATH, COMPRESSED_VERSION, 'sources', "Compression state")
+        # With --minify the deploy copy is what gets served, and its pages also depend on the minifier in the builder.
+        root = DEPLOY_DIR if self.minify else ROOT_DIR
+        # A source hash also covers the compressor, so changing its settings recompresses everything.
+        compressor = data_digest([file_digest(compress.__file__), compress.SUFFIXES, state_key(root), self.inputs['builder'] if self.minify else None])
+        outputs = {key: entry['hash'] for key, entry in self.manifest.outputs.items() if key.endswith(compress.EXTENSIONS)}
+        for directory in (POST_INDEX_DIR, ASSETS_DIR):
+            if not os.path.isdir(directory): continue
+            for filename in os.listdir(directory):
+                path = os.path.join(directory, filename)
+                if filename.endswith('.json'): outputs[state_key(path)] = file_digest(path)
+
+        sources, pending = {}, []
+        for key, digest in sorted(outputs.items()):
+            path = os.path.join(root, *key.split('/'))
+            sources[key] = data_digest([digest, compressor])
+            # Siblings the build writes itself (sitemap.xml.gz) are left alone.
+            suffixes = tuple(suffix for suffix in compress.SUFFIXES if key + suffix not in self.manifest.outputs)
+            if previous.get(key) == sources[key] and all(os.path.exists(path + suffix) for suffix in suffixes): continue
+            pending.append((path, suffixes))
+
+        if self.jobs > 1 and len(pending) > 1:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                results = list(executor.map(compress.compress_file, *zip(*pending)))
+        else:
+            results = [compress.compress_file(path, suffixes) for path, suffixes in pending]
+        for changed in results: self.changed += changed
+
+        for key in previous.keys() - sources.keys():
+            for suffix in compress.ENCODERS:
+                path = os.path.join(root, *key.split('/')) + suffix
+                if os.path.exists(path) and key + suffix not in self.manifest.outputs: self.remove_output(path)
+        save_state(COMPRESSED_PATH, COMPRESSED_VERSION, 'sources', sources)
+        note = '' if compress.brotli else " (brotli not installed: pip install brotli)"
+        print(f"  Compressed {len(pending)}/{len(sources)} outputs to {', '.join(compress.SUFFIXES)}{note}.")
+
+    def sitemap_urls(self):
+        """(url, output file, changefreq, priority, first-seen date, content digest) for every page in the sitemap."""
+        pages = [('/', INDEX_PATH, 'daily', '1.0'), ('/blog/', os.path.join(BLOG_DIR, 'index.html'), 'daily', '0.9')]
+        pages.append(('/legal', os.path.join(ROOT_DIR, 'legal.html'), 'monthly', '0.3'))
+        for slug, _, _ in self.listings()[1:]:
+            url = self.listing_url(slug)
+            pages.append((url, os.path.join(ROOT_DIR, *url.strip('/').split('/'), 'index.html'), 'weekly', '0.6'))
+        urls = [page + (None, self.page_digest(page[1])) for page in pages if os.path.exists(page[1])]
+        for post in self.posts_metadata:
+            # A post's content is its own fields and <main>; chrome, stylesheet and 推荐阅读 changes don't count.
+            digest = data_digest([self.inputs[post['url']], self.post_content[post['url']]])
+            urls.append((post['url'], post['file_path'], 'weekly', '0.8', post['date'], digest))
+        return urls
+
+    def page_digest(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            soup = parse_html(f.read())
+        digest = main_digest(soup.find('main') or soup.body)
+        soup.decompose()
+        return digest
+
     def generate_sitemap(self):
         sitemap_path = os.path.join(ROOT_DIR, 'sitemap.xml')
-        urls = []
-        urls.append({'loc': DOMAIN + '/', 'lastmod': datetime.now().strftime('%Y-%m-%d'), 'changefreq': 'daily', 'priority': '1.0'})
-        urls.append({'loc': DOMAIN + '/blog/', 'lastmod': datetime.now().strftime('%Y-%m-%d'), 'changefreq': 'daily', 'priority': '0.9'})
-        if os.path.exists(os.path.join(ROOT_DIR, 'legal.html')):
-             urls.append({'loc': DOMAIN + '/legal', 'lastmod': datetime.now().strftime('%Y-%m-%d'), 'changefreq': 'monthly', 'priority': '0.3'})
-        for post in self.posts_metadata:
-            urls.append({'loc': DOMAIN + post['url'], 'lastmod': post['date'], 'changefreq': 'weekly', 'priority': '0.8'})
-            
-        xml = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-        for url in urls:
-            xml += f"  <url>\n    <loc>{url['loc']}</loc>\n    <lastmod>{url['lastmod']}</lastmod>\n    <changefreq>{url['changefreq']}</changefreq>\n    <priority>{url['priority']}</priority>\n  </url>\n"
-        xml += '</urlset>'
-        with open(sitemap_path, 'w', encoding='utf-8') as f: f.write(xml)
-        print(f"  Generated sitemap with {len(urls)} URLs.")
-
-def watch_mode():
-    import time
+        entries = [(DOMAIN + url, self.lastmods.lastmod(url, digest, first_seen), changefreq, priority)
+                   for url, path, changefreq, priority, first_seen, digest in self.sitemap_urls()]
+        # lastmod follows page content, so the entries themselves are the only input.
+        deps = self.dependencies('builder')
+        deps['urls'] = data_digest(entries)
+        previous = [os.path.join(ROOT_DIR, key) for key in self.manifest.outputs if SITEMAP_FILE_RE.fullmatch(key)]
+        if previous and all(self.is_up_to_date(path, deps) for path in previous):
+            print("  Sitemap is up to date.")
+            return
+
+        writer = SitemapWriter(ROOT_DIR, DOMAIN)
+        for entry in entries: writer.add(*entry)
+        written = writer.close()
+        self.changed += writer.changed
+        for filename in written:
+            self.manifest.record(os.path.join(ROOT_DIR, filename), deps)
+        for filename in os.listdir(ROOT_DIR):
+            if SITEMAP_FILE_RE.fullmatch(filename) and filename not in written:
+                self.remove_output(os.path.join(ROOT_DIR, filename))
+        parts = f" in {len(written) // 2 - 1} files plus an index" if len(written) > 2 else ''
+        print(f"  Generated sitemap with {writer.urls} URLs{parts}.")
+
+_worker_builder = None
+
+def _init_worker(state):
+    global _worker_builder
+    _worker_builder = SiteBuilder.from_shared_state(state)
+
+def _reconstruct_worker(post):
+    return _worker_builder.timed_reconstruct(post)
+
+WATCH_SETTLE_SECONDS = 0.15
+
+def watch_mode(builder):
+    import queue
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
 
     print("👀 Starting Watch Mode...")
-    print("   Monitoring changes in /blog directory...")
+    print("   Monitoring changes in /blog and the root pages...")
     print("   Press Ctrl+C to stop.")
 
-    class BuildHandler(FileSystemEventHandler):
-        def __init__(self):
-            self.last_build = 0
-            self.cooldown = 2  # Seconds
+    # Events are queued, never dropped; the main loop coalesces each burst into one build.
+    events = queue.Queue()
 
+    class BuildHandler(FileSystemEventHandler):
         def on_any_event(self, event):
             if event.is_directory: return
-            if not event.src_path.endswith('.html'): return
-            
-            # Simple debounce
-            now = time.time()
-            if now - self.last_build < self.cooldown: return
-            self.last_build = now
-
-            print(f"\n🔄 File changed: {os.path.basename(event.src_path)}")
-            try:
-                builder = SiteBuilder()
-                builder.run()
-            except Exception as e:
-                print(f"❌ Build failed: {e}")
+            # Editors often save via rename, so the interesting path may be dest_path.
+            for path in (event.src_path, getattr(event, 'dest_path', None)):
+                if path and (path.endswith('.html') or os.path.abspath(path) == STYLES_PATH):
+                    events.put(os.path.abspath(path))
 
     observer = Observer()
     handler = BuildHandler()
     observer.schedule(handler, BLOG_DIR, recursive=False)
-    # Also watch the script itself
     observer.schedule(handler, ROOT_DIR, recursive=False)
     
+    # Warm up the manifest, metadata cache and chrome before the first edit arrives.
+    builder.run()
+    builder.full = False # --full only applies to the warm-up build
     observer.start()
     try:
         while True:
-            time.sleep(1)
+            try:
+                changed = {events.get(timeout=1)}
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    changed.add(events.get(timeout=WATCH_SETTLE_SECONDS))
+                except queue.Empty:
+                    break
+
+            # Our own writes show up as events too; they match the manifest and are skipped.
+            changed = sorted(path for path in changed if not builder.manifest.is_own_output(path))
+            if not changed: continue
+
+            print(f"\n🔄 File changed: {', '.join(os.path.basename(path) for path in changed)}")
+            start = time.time()
+            try:
+                builder.run()
+                print(f"   Rebuilt in {time.time() - start:.2f}s")
+            except Exception as e:
+                print(f"❌ Build failed: {e}")
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
 
 if __name__ == "__main__":
-    import sys
+    parser = argparse.ArgumentParser(description="Build the ClaudeMai static site.")
+    parser.add_argument('--watch', action='store_true', help="rebuild whenever a blog post changes")
+    parser.add_argument('--full', action='store_true', help="ignore the build manifest and regenerate every output")
+    parser.add_argument('--jobs', type=int, default=1, help="worker processes for page reconstruction and compression (0 = one per CPU)")
+    parser.add_argument('--minify', action='store_true', help="also write the site with minified HTML to dist/ for deployment; the source pages stay prettified")
+    parser.add_argument('--compress', action='store_true', help="write precompressed .gz/.br siblings of the HTML, XML and JSON outputs")
+    parser.add_argument('--parser', choices=parsing.PARSER_PREFERENCE, help="HTML parser backend (default: fastest installed)")
+    parser.add_argument('--profile', nargs='?', const=PROFILE_REPORT_PATH, metavar='REPORT', help=f"record per-phase time and memory and per-page time, and write a JSON report (default: {os.path.relpath(PROFILE_REPORT_PATH)})")
+    parser.add_argument('--profile-top', type=int, default=10, metavar='N', help="slowest pages to list in the --profile summary")
+    parser.add_argument('--cprofile', metavar='PATH', help="also write a cProfile dump of the build (implies --profile)")
+    args = parser.parse_args()
+    if args.parser: parsing.set_parser(args.parser)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    profiler = None
+    if args.profile or args.cprofile:
+        profiler = BuildProfiler(args.profile or PROFILE_REPORT_PATH, top=args.profile_top, cprofile_path=args.cprofile)
+    builder = SiteBuilder(full=args.full, jobs=jobs, minify=args.minify, compress=args.compress, profiler=profiler)
     # Install watchdog if missing: pip install watchdog
-    if len(sys.argv) > 1 and sys.argv[1] == '--watch':
+    if args.watch:
         try:
             import watchdog
-            watch_mode()
         except ImportError:
             print("❌ Watchdog library not found. Please install it first:")
             print("   pip install watchdog")
             sys.exit(1)
+        watch_mode(builder)
     else:
-        builder = SiteBuilder()
         builder.run()
\ No newline at end of file
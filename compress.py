@@ -0,0 +1,31 @@
+"""Precompressed siblings (.gz and .br) for build.py's text outputs.
+
+Static hosts can serve path.gz / path.br directly when the client accepts the
+encoding, so the edge never compresses on the fly. Both are written at maximum
+level, through output.write_if_changed, with deterministic headers.
+
+Brotli is optional: without the `brotli` package only .gz siblings are written.
+"""
+import gzip
+from output import write_if_changed
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+EXTENSIONS = ('.html', '.xml', '.json')
+SUFFIXES = ('.gz', '.br') if brotli else ('.gz',)
+
+def gzip_bytes(data):
+    # mtime=0 and no filename in the header, so the same input always gives the same bytes.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+ENCODERS = {'.gz': gzip_bytes}
+if brotli: ENCODERS['.br'] = lambda data: brotli.compress(data, quality=11)
+
+def compress_file(path, suffixes=SUFFIXES):
+    """Write the `suffixes` siblings of `path`. Returns the sibling paths whose content changed."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return [path + suffix for suffix in suffixes if write_if_changed(path + suffix, ENCODERS[suffix](data))]
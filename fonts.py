@@ -0,0 +1,53 @@
+"""Self-hosted, subsetted web fonts for build.py.
+
+Font files dropped into fonts/ (TTF, OTF, WOFF or WOFF2, static or variable)
+are cut down to the characters the site actually uses and written as WOFF2.
+Family, weight and style are read from the font's own tables, so the files
+need no naming convention. A family with a local file is no longer requested
+from Google Fonts.
+
+fontTools (plus brotli, for WOFF2) is optional: without it, or without any
+local font files, pages keep loading every family from Google Fonts.
+"""
+import io
+import logging
+
+try:
+    import brotli # WOFF2 compression; fontTools imports it lazily
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+    # Tables the subsetter cannot handle are dropped; that is expected, not worth a warning per font.
+    logging.getLogger('fontTools.subset').setLevel(logging.ERROR)
+except ImportError:
+    subset = None
+
+available = subset is not None
+EXTENSIONS = ('.ttf', '.otf', '.woff', '.woff2')
+# Printable ASCII is always kept, so digits and punctuation never switch fonts mid-word.
+BASE_TEXT = ''.join(chr(c) for c in range(0x20, 0x7f))
+
+def extra_chars(text):
+    """Characters of `text` beyond printable ASCII (which BASE_TEXT always covers)."""
+    return {c for c in text if c > '~'}
+
+def describe(font):
+    """(family, CSS font-weight, CSS font-style) of a TTFont; variable fonts get their weight range."""
+    family = font['name'].getDebugName(16) or font['name'].getDebugName(1)
+    os2 = font['OS/2']
+    style = 'italic' if os2.fsSelection & 1 else 'normal'
+    axis = next((axis for axis in font['fvar'].axes if axis.axisTag == 'wght'), None) if 'fvar' in font else None
+    weight = f"{axis.minValue:g} {axis.maxValue:g}" if axis else str(os2.usWeightClass)
+    return family, weight, style
+
+def subset_font(path, text):
+    """Subset the font at `path` to `text`. Returns (family, weight, style, WOFF2 bytes)."""
+    # Keep the original head timestamp so the same input always gives the same bytes.
+    font = TTFont(path, recalcTimestamp=False)
+    family, weight, style = describe(font)
+    subsetter = subset.Subsetter(subset.Options())
+    subsetter.populate(text=BASE_TEXT + text)
+    subsetter.subset(font)
+    font.flavor = 'woff2'
+    data = io.BytesIO()
+    font.save(data)
+    return family, weight, style, data.getvalue()
@@ -0,0 +1,38 @@
+"""Atomic, write-if-changed file output shared by the build writers.
+
+New content is compared with what is on disk and the file is only replaced
+when the bytes differ, so unchanged outputs keep their mtime and stay out of
+deploys and cache purges. Replacement goes through a temp file in the same
+directory and os.replace, so a reader never sees a half-written file.
+"""
+import os
+import filecmp
+
+def temp_path(path):
+    # Per process, so parallel workers never share a temp file.
+    return f"{path}.{os.getpid()}.tmp"
+
+def same_content(path, data):
+    try:
+        if os.path.getsize(path) != len(data): return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+def write_if_changed(path, data):
+    """Write `data` (bytes) to `path` unless it already holds exactly that. Returns True if the file changed."""
+    if same_content(path, data): return False
+    tmp = temp_path(path)
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return True
+
+def replace_if_changed(tmp, path):
+    """Move a finished temp file onto `path`, or drop it if `path` already has the same bytes. Returns True if the file changed."""
+    if os.path.exists(path) and filecmp.cmp(tmp, path, shallow=False):
+        os.remove(tmp)
+        return False
+    os.replace(tmp, path)
+    return True
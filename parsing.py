@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Shared HTML parser backend for build.py and audit.py.
+
+Full documents go through the fastest BeautifulSoup tree builder that is
+installed (lxml when available, html.parser otherwise). Snippets that are
+spliced into an existing tree always use html.parser, because lxml wraps
+fragments in <html><body>.
+
+    python parsing.py --check   # verify every installed backend parses our pages identically
+
+tests/test_parsing.py builds the site with each backend and compares the outputs.
+"""
+import os
+import sys
+import glob
+from bs4 import BeautifulSoup, Tag, NavigableString, Comment, Doctype
+from bs4.builder import builder_registry
+
+# Fastest first. html.parser ships with Python, so the list never runs dry.
+PARSER_PREFERENCE = ['lxml', 'html.parser']
+FRAGMENT_PARSER = 'html.parser'
+
+def is_available(name):
+    return builder_registry.lookup(name) is not None
+
+def available_parsers():
+    return [name for name in PARSER_PREFERENCE if is_available(name)]
+
+def select_parser(preferred=None):
+    """Return the parser to use: `preferred` (or $HTML_PARSER) if installed, else the fastest one."""
+    preferred = preferred or os.environ.get('HTML_PARSER')
+    if preferred:
+        if is_available(preferred): return preferred
+        print(f"⚠️ HTML parser '{preferred}' is not installed, falling back.")
+    return available_parsers()[0]
+
+PARSER = select_parser()
+
+def set_parser(name):
+    global PARSER
+    PARSER = select_parser(name)
+    return PARSER
+
+def parse_html(markup, parser=None):
+    soup = BeautifulSoup(markup, parser or PARSER)
+    # html.parser keeps the newline between the doctype and <html> as a text node; lxml drops it.
+    # Dropping it here makes both serialize documents byte for byte the same.
+    for child in list(soup.children):
+        if isinstance(child, Tag): break
+        if type(child) is NavigableString and not child.strip(): child.extract()
+    return soup
+
+def parse_fragment(markup):
+    return BeautifulSoup(markup, FRAGMENT_PARSER)
+
+def document_signature(soup):
+    """Flatten a tree into open/text/close events, ignoring whitespace-only text.
+
+    Backends disagree on insignificant whitespace (e.g. the newline after the
+    doctype) but must agree on structure, attributes and text.
+    """
+    events = []
+    def walk(node):
+        for child in node.children:
+            if isinstance(child, Tag):
+                attrs = sorted((k, ' '.join(v) if isinstance(v, list) else v) for k, v in child.attrs.items())
+                events.append(('open', child.name, tuple(attrs)))
+                walk(child)
+                events.append(('close', child.name))
+            elif isinstance(child, (Comment, Doctype)):
+                events.append((type(child).__name__, child.strip()))
+            elif isinstance(child, NavigableString) and child.strip():
+                events.append(('text', child.strip()))
+    walk(soup)
+    return events
+
+def corpus_files(root_dir):
+    files = sorted(glob.glob(os.path.join(root_dir, '*.html')) + glob.glob(os.path.join(root_dir, 'blog', '*.html')))
+    # Site verification stubs are plain text with an .html extension.
+    return [f for f in files if '<html' in open(f, 'r', encoding='utf-8', errors='ignore').read(4096).lower()]
+
+def check_parity(root_dir):
+    parsers = available_parsers()
+    if len(parsers) < 2:
+        print(f"Only {parsers[0]} is installed; nothing to compare. pip install lxml")
+        return True
+    reference, others = parsers[-1], parsers[:-1]
+    mismatches = 0
+    for file_path in corpus_files(root_dir):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            markup = f.read()
+        expected = document_signature(parse_html(markup, reference))
+        for name in others:
+            actual = document_signature(parse_html(markup, name))
+            if actual != expected:
+                mismatches += 1
+                index = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+                print(f"❌ {os.path.relpath(file_path, root_dir)}: {name} differs from {reference} at event {index}")
+                print(f"    {reference}: {expected[index] if index < len(expected) else '<end>'}")
+                print(f"    {name}: {actual[index] if index < len(actual) else '<end>'}")
+    print(f"Compared {', '.join(others)} against {reference}: {mismatches} mismatching document(s).")
+    return mismatches == 0
+
+if __name__ == "__main__":
+    if '--check' in sys.argv:
+        sys.exit(0 if check_parity(os.path.dirname(os.path.abspath(__file__))) else 1)
+    print(f"Available parsers: {', '.join(available_parsers())} (using {PARSER})")
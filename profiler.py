@@ -0,0 +1,82 @@
+"""Build profiling for build.py's --profile mode.
+
+Every phase records its wall time plus the memory tracemalloc saw while it
+ran: the peak, and what was still allocated at the end. Every reconstructed
+page records its own wall time. The report is written as JSON, and a summary
+with the slowest pages is printed. A cProfile dump of the whole run can be
+written as well, for pstats or snakeviz.
+
+tracemalloc and cProfile only see the main process. With --jobs, the workers'
+memory is missing from the phase figures, but the workers still report their
+page timings.
+"""
+import os
+import json
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+
+MB = 1024 * 1024
+
+class BuildProfiler:
+    def __init__(self, report_path, top=10, cprofile_path=None):
+        self.report_path = report_path
+        self.top = top
+        self.cprofile_path = cprofile_path
+
+    def start(self):
+        self.phases = []
+        self.pages = {} # page path -> seconds spent in reconstruct_page
+        self.cprofile = cProfile.Profile() if self.cprofile_path else None
+        tracemalloc.start()
+        if self.cprofile: self.cprofile.enable()
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            self.phases.append({'name': name, 'seconds': seconds, 'peak_bytes': peak, 'retained_bytes': current})
+
+    def page(self, path, seconds):
+        self.pages[path] = seconds
+
+    def report(self):
+        pages = sorted(self.pages.items(), key=lambda x: x[1], reverse=True)
+        return {
+            'total_seconds': self.total_seconds,
+            'peak_bytes': max((phase['peak_bytes'] for phase in self.phases), default=0),
+            'phases': self.phases,
+            'pages': [{'path': path, 'seconds': seconds} for path, seconds in pages],
+        }
+
+    def finish(self):
+        """Stop measuring, write the JSON report (and the cProfile dump) and print the summary."""
+        self.total_seconds = time.perf_counter() - self.started
+        if self.cprofile:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(self.cprofile_path)
+        tracemalloc.stop()
+        report = self.report()
+        os.makedirs(os.path.dirname(os.path.abspath(self.report_path)), exist_ok=True)
+        with open(self.report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(self.table(report))
+
+    def table(self, report):
+        lines = [f"📊 Build profile: {report['total_seconds']:.3f}s, peak {report['peak_bytes'] / MB:.1f} MB traced",
+                 f"  {'phase':<24} {'time':>9} {'peak':>10} {'retained':>10}"]
+        for phase in report['phases']:
+            lines.append(f"  {phase['name']:<24} {phase['seconds']:>8.3f}s {phase['peak_bytes'] / MB:>7.1f} MB {phase['retained_bytes'] / MB:>7.1f} MB")
+        pages = report['pages']
+        if pages:
+            lines.append(f"  Slowest pages ({min(self.top, len(pages))} of {len(pages)} reconstructed):")
+            lines += [f"  {page['seconds']:>8.3f}s  {page['path']}" for page in pages[:self.top]]
+        lines.append(f"  Report written to {self.report_path}" + (f", cProfile dump to {self.cprofile_path}" if self.cprofile else ''))
+        return '\n'.join(lines)
@@ -0,0 +1,220 @@
+"""Content-similarity "推荐阅读" index for build.py.
+
+Posts are tokenized into Latin words and CJK character bigrams, weighted with
+TF-IDF and compared by cosine similarity, in batched matrix products with no
+per-pair Python loops. With SciPy the documents form a sparse matrix and every
+score is exact. With NumPy alone they form a dense matrix capped at
+MAX_MATRIX_CELLS, whose columns are the rarest shared terms, the ones that
+best tell posts apart.
+
+Each post's best candidates and their scores are cached in .build/related.json.
+When posts are added, edited or removed, only their rows are recomputed and
+merged into the other posts' candidate lists; a post whose list runs short is
+recomputed too. The IDF weights stay frozen between full computations, which
+run again once more than REBASE_FRACTION of the posts have changed.
+
+NumPy is optional: without it RelatedIndex.available is False and the
+builder keeps its date-ordered recommendations.
+"""
+import os
+import re
+import math
+import json
+import hashlib
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+RELATED_CACHE_VERSION = 2
+RELATED_POSTS = 3
+# Candidates kept per post, so later updates can drop changed posts from its list without recomputing its row.
+CANDIDATES = 4 * RELATED_POSTS
+# Share of changed posts after which the IDF weights are recomputed along with every row.
+REBASE_FRACTION = 0.1
+# Title words matter more than body words when deciding what a post is about.
+FIELD_WEIGHTS = {'title': 3, 'description': 2, 'body': 1}
+# Cap on terms per post used for similarity; the long tail of single mentions adds little.
+MAX_TERMS_PER_POST = 400
+# Upper bound on float32 cells held at once (one similarity block, and the dense document matrix without SciPy).
+MAX_MATRIX_CELLS = 1 << 26
+
+# The blog search client compiles the same patterns in JavaScript.
+LATIN_PATTERN = r'[a-z][a-z0-9]*(?:[.\-+#][a-z0-9]+)*'
+CJK_RUN_PATTERN = r'[㐀-䶿一-鿿豈-﫿]+'
+LATIN_RE = re.compile(LATIN_PATTERN)
+CJK_RUN_RE = re.compile(CJK_RUN_PATTERN)
+
+def tokenize(text):
+    """Latin words (lowercased) plus overlapping CJK bigrams; a lone CJK character is kept as-is."""
+    text = text.lower()
+    tokens = LATIN_RE.findall(text)
+    for run in CJK_RUN_RE.findall(text):
+        if len(run) == 1: tokens.append(run)
+        else: tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+def term_counts(title, description, body):
+    counts = Counter()
+    for field, text in (('title', title), ('description', description), ('body', body)):
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(text or ''):
+            counts[token] += weight
+    return dict(counts)
+
+def top_terms(counts, limit=MAX_TERMS_PER_POST):
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit])
+
+def doc_digest(doc):
+    payload = json.dumps(doc, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class RelatedIndex:
+    """Top-k most similar posts for every post, cached and updated incrementally between builds."""
+
+    available = np is not None
+
+    def __init__(self, cache_path):
+        self.cache_path = cache_path
+        self.df = {} # document frequencies the IDF weights are frozen at
+        self.basis = 0 # post count at the last full computation
+        self.stale = 0 # posts added, edited or removed since then
+        self.posts = {} # {url: {'digest', 'candidates': [[url, score], ...], 'cutoff'}}
+        self.neighbours = {}
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == RELATED_CACHE_VERSION:
+                self.df, self.basis, self.stale, self.posts = data['df'], data['basis'], data['stale'], data['posts']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def update(self, urls, terms, digests=None):
+        """Bring the neighbours of `urls` (date-ordered) up to date with their top_terms().
+
+        `digests` identifies each post's terms; it defaults to hashing them.
+        Returns the number of rows recomputed.
+        """
+        docs = {url: terms[url] for url in urls}
+        if digests is None: digests = {url: doc_digest(doc) for url, doc in docs.items()}
+        changed = [url for url in urls if url not in self.posts or self.posts[url]['digest'] != digests[url]]
+        removed = self.posts.keys() - set(urls)
+        recomputed = 0
+        if self.posts and self.stale + len(changed) + len(removed) <= REBASE_FRACTION * max(self.basis, len(urls)):
+            if changed or removed:
+                self.stale += len(changed) + len(removed)
+                for url in removed: del self.posts[url]
+                for url in changed: self.posts[url] = {'digest': digests[url]}
+                recomputed = self._recompute(urls, docs, changed, merge=True)
+        else:
+            df = Counter()
+            for doc in docs.values(): df.update(doc.keys())
+            self.df, self.basis, self.stale = dict(df), len(urls), 0
+            self.posts = {url: {'digest': digests[url]} for url in urls}
+            recomputed = self._recompute(urls, docs, urls, merge=False)
+        if recomputed or removed: self._save()
+
+        order = {url: i for i, url in enumerate(urls)}
+        self.neighbours = {}
+        for url in urls:
+            # Highest score first; ties go to the newer post (lower index in date order).
+            ranked = sorted(self.posts[url]['candidates'], key=lambda c: (-c[1], order[c[0]]))
+            self.neighbours[url] = [other for other, score in ranked[:RELATED_POSTS] if score > 0]
+        return recomputed
+
+    def _recompute(self, urls, docs, rows, merge, matrix=None):
+        """Recompute the candidates of `rows`. With `merge`, also fold their new scores into every other post's list,
+        and recompute the posts whose lists no longer settle their top RELATED_POSTS."""
+        n = len(urls)
+        if n < 2:
+            for url in urls: self.posts[url].update(candidates=[], cutoff=0.0)
+            return len(rows)
+        if matrix is None: matrix = self._matrix([docs[url] for url in urls])
+        index = {url: i for i, url in enumerate(urls)}
+        fresh = set(rows)
+        if merge:
+            for url in urls:
+                if url not in fresh:
+                    entry = self.posts[url]
+                    entry['candidates'] = [c for c in entry['candidates'] if c[0] not in fresh and c[0] in index]
+            cutoffs = np.array([0.0 if url in fresh else self.posts[url]['cutoff'] for url in urls], dtype=np.float32)
+
+        take = min(n - 1, CANDIDATES)
+        row_ids = np.array([index[url] for url in rows])
+        block = max(1, MAX_MATRIX_CELLS // (4 * n))
+        for start in range(0, len(row_ids), block):
+            ids = row_ids[start:start + block]
+            scores = matrix[ids] @ matrix.T
+            if sparse is not None: scores = scores.toarray()
+            # Round away BLAS summation noise so ties (and output) are identical across machines.
+            scores = np.round(scores, 5)
+            scores[np.arange(len(ids)), ids] = -1.0
+            # Over-fetch so ties at the cut-off are still resolved by date in update().
+            top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            for r, (i, candidates) in enumerate(zip(ids, top)):
+                row_scores = scores[r, candidates]
+                kept = row_scores > 0
+                # Posts left out of a full list score at most its lowest entry; that bound is the cutoff.
+                cutoff = float(row_scores.min()) if take < n - 1 and kept.all() else 0.0
+                self.posts[urls[i]].update(candidates=[[urls[j], round(float(s), 5)] for j, s in zip(candidates[kept], row_scores[kept])], cutoff=round(cutoff, 5))
+            if merge:
+                # Scores are symmetric: the new rows are also the new columns of every other post.
+                for r, j in zip(*np.nonzero(scores > cutoffs[None, :])):
+                    if urls[j] not in fresh: self.posts[urls[j]]['candidates'].append([urls[ids[r]], round(float(scores[r, j]), 5)])
+
+        recomputed = len(rows)
+        if merge:
+            short = []
+            for url in urls:
+                if url in fresh: continue
+                entry = self.posts[url]
+                entry['candidates'].sort(key=lambda c: (-c[1], c[0]))
+                # Every post outside the list scores at most the cutoff, so the top is settled while enough entries beat it.
+                if entry['cutoff'] > 0 and sum(1 for c in entry['candidates'] if c[1] > entry['cutoff']) < RELATED_POSTS:
+                    short.append(url)
+                    continue
+                if len(entry['candidates']) > CANDIDATES:
+                    entry['cutoff'] = max(entry['cutoff'], entry['candidates'][CANDIDATES][1])
+                    del entry['candidates'][CANDIDATES:]
+            if short: recomputed += self._recompute(urls, docs, short, merge=False, matrix=matrix)
+        return recomputed
+
+    def _matrix(self, docs):
+        """Row-normalized TF-IDF document matrix: sparse with SciPy, dense over a capped set of columns without it."""
+        n = self.basis
+        idf = lambda t: math.log((1 + n) / (1 + self.df.get(t, 0))) + 1
+        if sparse is not None:
+            columns, indptr, indices, data = {}, [0], [], []
+            for doc in docs:
+                for t, c in doc.items():
+                    indices.append(columns.setdefault(t, len(columns)))
+                    data.append((1 + math.log(c)) * idf(t))
+                indptr.append(len(indices))
+            matrix = sparse.csr_matrix((np.array(data, dtype=np.float32), indices, indptr), shape=(len(docs), max(1, len(columns))))
+            norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+            norms[norms == 0] = 1.0
+            return sparse.csr_matrix(sparse.diags(1 / norms) @ matrix, dtype=np.float32)
+
+        # Norms use every term so cosine stays exact; only terms shared by 2+ posts
+        # can contribute to a dot product, so only those become matrix columns.
+        norms = np.array([math.sqrt(sum(((1 + math.log(c)) * idf(t)) ** 2 for t, c in doc.items())) or 1.0 for doc in docs], dtype=np.float32)
+        shared = sorted((t for t, count in self.df.items() if count >= 2), key=lambda t: (self.df[t], t))
+        columns = {t: i for i, t in enumerate(shared[:max(1, MAX_MATRIX_CELLS // len(docs))])}
+        matrix = np.zeros((len(docs), max(1, len(columns))), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for t, c in doc.items():
+                col = columns.get(t)
+                if col is not None: matrix[row, col] = (1 + math.log(c)) * idf(t)
+        matrix /= norms[:, None]
+        return matrix
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': RELATED_CACHE_VERSION, 'df': self.df, 'basis': self.basis, 'stale': self.stale, 'posts': self.posts}, f, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
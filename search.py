@@ -0,0 +1,40 @@
+"""Build-time full-text search index for the blog SPA.
+
+Posts are indexed with the same tokens and field weights as the related-post
+index (related.term_counts over title, description and article text, cut to
+related.top_terms). The index is a single JSON document:
+
+    {"docs": N, "terms": [shared, suffix, ...], "postings": [[gap, weight, ...], ...]}
+
+Terms are sorted and front-coded: each term is stored as the length of the
+prefix it shares with the previous term, followed by the rest of it.
+postings[i] belongs to the i-th term and lists the posts containing it as
+doc id gaps (ids are positions in the date-ordered 'all' listing), each
+followed by the term's weighted count in that post. Ranking happens in the
+browser.
+"""
+
+def common_prefix(a, b):
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]: i += 1
+    return i
+
+def build_index(docs):
+    """`docs` is a list of {term: weight} dicts, in doc id order."""
+    postings = {}
+    for doc_id, terms in enumerate(docs):
+        for term, weight in terms.items():
+            postings.setdefault(term, []).append((doc_id, weight))
+
+    terms, lists, previous = [], [], ''
+    for term in sorted(postings):
+        shared = common_prefix(previous, term)
+        terms += [shared, term[shared:]]
+        encoded, last = [], 0
+        for doc_id, weight in postings[term]:
+            encoded += [doc_id - last, weight]
+            last = doc_id
+        lists.append(encoded)
+        previous = term
+    return {'docs': len(docs), 'terms': terms, 'postings': lists}
@@ -0,0 +1,139 @@
+"""Service worker and precache manifest for build.py.
+
+sw.js itself only names the current precache manifest, a content-hashed JSON
+file in assets/ that lists:
+
+- precache: the homepage, the blog index, the post index data and the shared
+  assets, each with its revision (None when the URL is already hashed)
+- posts: the revision of every post page
+- assets: every hashed file still published, so runtime copies of removed
+  ones can be dropped
+
+A build that changes any of it gives sw.js new bytes, which is what makes
+browsers install the new worker. On install only entries whose URL or revision
+changed are downloaded; on activate cached entries that no longer match are
+deleted, and everything else stays.
+
+Posts are served stale-while-revalidate, hashed files cache-first, and the
+precached pages straight from the precache.
+"""
+import json
+
+SCRIPT_PATH = '/sw.js'
+# Injected into every page; registration waits for load so it never competes with first paint.
+REGISTER = f"<script data-sw=\"\">if('serviceWorker' in navigator)addEventListener('load',()=>navigator.serviceWorker.register('{SCRIPT_PATH}'))</script>"
+
+SCRIPT = """// Generated by build.py; changes here are overwritten.
+const MANIFEST = __MANIFEST__;
+const IMMUTABLE = __IMMUTABLE__;
+const PRECACHE = 'claudemai-precache';
+const POSTS = 'claudemai-posts';
+const ASSETS = 'claudemai-assets';
+
+// Revisioned entries are cached under their own key, so a changed page never matches its old copy.
+const cacheKey = (url, revision) => new URL(revision ? `${url}?__rev=${revision}` : url, self.location).href;
+
+let manifest = null;
+function loadManifest() {
+  if (!manifest) {
+    manifest = caches.match(MANIFEST, {cacheName: PRECACHE})
+      .then(response => response || fetch(MANIFEST))
+      .then(response => response.json())
+      .catch(error => { manifest = null; throw error; });
+  }
+  return manifest;
+}
+
+self.addEventListener('install', event => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(PRECACHE);
+    const response = await fetch(MANIFEST);
+    if (!response.ok) throw new Error(`${MANIFEST}: ${response.status}`);
+    await cache.put(MANIFEST, response.clone());
+    const data = await response.json();
+    await Promise.all(Object.entries(data.precache).map(async ([url, revision]) => {
+      const key = cacheKey(url, revision);
+      if (await cache.match(key)) return;
+      const entry = await fetch(url, {cache: 'reload'});
+      if (!entry.ok) throw new Error(`${url}: ${entry.status}`);
+      await cache.put(key, entry);
+    }));
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener('activate', event => {
+  event.waitUntil((async () => {
+    const data = await loadManifest();
+    const keep = {
+      [PRECACHE]: new Set([cacheKey(MANIFEST), ...Object.entries(data.precache).map(([url, revision]) => cacheKey(url, revision))]),
+      [POSTS]: new Set(Object.entries(data.posts).map(([url, revision]) => cacheKey(url, revision))),
+      [ASSETS]: new Set(data.assets.map(url => cacheKey(url))),
+    };
+    for (const name of await caches.keys()) {
+      if (!keep[name]) {
+        await caches.delete(name);
+        continue;
+      }
+      const cache = await caches.open(name);
+      for (const request of await cache.keys()) {
+        if (!keep[name].has(request.url)) await cache.delete(request);
+      }
+    }
+    await self.clients.claim();
+  })());
+});
+
+async function cacheFirst(request) {
+  const cached = await caches.match(request);
+  if (cached) return cached;
+  const response = await fetch(request);
+  if (response.ok) {
+    const cache = await caches.open(ASSETS);
+    await cache.put(request, response.clone());
+  }
+  return response;
+}
+
+async function staleWhileRevalidate(event, key) {
+  const cache = await caches.open(POSTS);
+  const cached = await cache.match(key);
+  const network = fetch(event.request).then(async response => {
+    if (response.ok) await cache.put(key, response.clone());
+    return response;
+  });
+  if (!cached) return network;
+  event.waitUntil(network.catch(() => {}));
+  return cached;
+}
+
+async function navigate(event, path) {
+  let data;
+  try {
+    data = await loadManifest();
+  } catch (error) {
+    return fetch(event.request);
+  }
+  if (path in data.precache) {
+    const cached = await caches.match(cacheKey(path, data.precache[path]), {cacheName: PRECACHE});
+    return cached || fetch(event.request);
+  }
+  if (path in data.posts) return staleWhileRevalidate(event, cacheKey(path, data.posts[path]));
+  return fetch(event.request);
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== self.location.origin) return;
+  if (IMMUTABLE.some(prefix => url.pathname.startsWith(prefix))) {
+    event.respondWith(cacheFirst(request));
+  } else if (request.mode === 'navigate') {
+    event.respondWith(navigate(event, url.pathname.replace(/\\.html$/, '')));
+  }
+});
+"""
+
+def render(manifest_url, immutable_prefixes):
+    """sw.js for the precache manifest at `manifest_url`; URLs under `immutable_prefixes` are content-hashed."""
+    return SCRIPT.replace('__MANIFEST__', json.dumps(manifest_url)).replace('__IMMUTABLE__', json.dumps(list(immutable_prefixes)))
@@ -0,0 +1,114 @@
+"""Streaming sitemap writer for build.py.
+
+URLs are written out one at a time, so memory use does not grow with the site.
+A sitemap file holds at most MAX_URLS URLs and MAX_BYTES uncompressed bytes
+(the limits of the sitemaps.org protocol). While everything fits, the output
+is a single sitemap.xml urlset. Past that, the parts become sitemap-1.xml,
+sitemap-2.xml, ... and sitemap.xml is a sitemap index pointing at them.
+
+Every file gets a gzipped sibling (.xml.gz) written in the same pass. Parts
+are streamed into temp files and only moved into place (if their bytes
+changed) once the final layout is known.
+"""
+import os
+import gzip
+from output import temp_path, replace_if_changed
+from xml.sax.saxutils import escape
+
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = XML_HEADER + '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>'
+INDEX_OPEN = XML_HEADER + '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = '</sitemapindex>'
+
+class _SitemapFile:
+    """One output file plus its .gz sibling, streamed in step into temp files."""
+
+    def __init__(self, path):
+        self.path = path
+        self.raw = open(temp_path(path), 'wb')
+        self.gz_raw = open(temp_path(path + '.gz'), 'wb')
+        # No name or mtime in the gzip header, so unchanged content gives identical bytes.
+        self.gz = gzip.GzipFile(filename='', mode='wb', fileobj=self.gz_raw, compresslevel=9, mtime=0)
+        self.size = 0
+        self.count = 0
+        self.lastmod = ''
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self.raw.write(data)
+        self.gz.write(data)
+        self.size += len(data)
+
+    def close(self):
+        self.raw.close()
+        self.gz.close()
+        self.gz_raw.close()
+
+    def commit(self, path):
+        """Move both files onto `path` and `path`.gz. Returns the paths whose content changed."""
+        return [target for source, target in ((self.path, path), (self.path + '.gz', path + '.gz'))
+                if replace_if_changed(temp_path(source), target)]
+
+class SitemapWriter:
+    def __init__(self, directory, base_url, name='sitemap', max_urls=MAX_URLS, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.base_url = base_url
+        self.name = name
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.parts = [] # finished parts, still in their temp files
+        self.current = None
+        self.urls = 0
+        self.changed = [] # output paths whose content changed
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def open_part(self):
+        self.current = _SitemapFile(self.path(f"{self.name}-{len(self.parts) + 1}.xml"))
+        self.current.write(URLSET_OPEN)
+
+    def close_part(self):
+        self.current.write(URLSET_CLOSE)
+        self.current.close()
+        self.parts.append(self.current)
+        self.current = None
+
+    def add(self, loc, lastmod, changefreq, priority):
+        entry = f"  <url>\n    <loc>{escape(loc)}</loc>\n    <lastmod>{lastmod}</lastmod>\n    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n"
+        size = len(entry.encode('utf-8'))
+        if self.current and (self.current.count == self.max_urls or self.current.size + size + len(URLSET_CLOSE) > self.max_bytes):
+            self.close_part()
+        if not self.current: self.open_part()
+        self.current.write(entry)
+        self.current.count += 1
+        self.current.lastmod = max(self.current.lastmod, lastmod)
+        self.urls += 1
+
+    def close(self):
+        """Finish the last part, move everything into place and, if there are several parts, write the index.
+
+        Returns every filename that makes up the sitemap (.gz included).
+        """
+        if not self.current and not self.parts: self.open_part()
+        if self.current: self.close_part()
+        index_name = f"{self.name}.xml"
+        if len(self.parts) == 1:
+            self.changed += self.parts[0].commit(self.path(index_name))
+            return [index_name, index_name + '.gz']
+
+        filenames = []
+        index = _SitemapFile(self.path(index_name))
+        index.write(INDEX_OPEN)
+        for part in self.parts:
+            filename = os.path.basename(part.path)
+            self.changed += part.commit(part.path)
+            filenames += [filename, filename + '.gz']
+            index.write(f"  <sitemap>\n    <loc>{escape(self.base_url + '/' + filename)}</loc>\n    <lastmod>{part.lastmod}</lastmod>\n  </sitemap>\n")
+        index.write(INDEX_CLOSE)
+        index.close()
+        self.changed += index.commit(index.path)
+        return filenames + [index_name, index_name + '.gz']
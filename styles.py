@@ -0,0 +1,83 @@
+"""Post style and category registry for build.py.
+
+Styles, categories and matching rules live in styles.json. Rules are tried in
+file order: each one lists keywords that select its style when they appear in
+the post's filename or (lowercased) title. At load time every keyword is
+compiled into one zero-width alternation, so classifying a post is a single
+regex scan over "title\\nfilename" that keeps the highest-priority hit.
+
+Every post of a style shares the same read-only Style object.
+"""
+import re
+import json
+import hashlib
+
+STYLE_FIELDS = ('icon', 'bg_gradient', 'text_color', 'badge_color', 'badge_text', 'category')
+MATCH_FIELDS = ('filename', 'title')
+
+class Style(dict):
+    """A style shared by many posts. It is a dict so it still goes straight into json.dumps, but it cannot be modified."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"style '{self['id']}' is shared between posts and cannot be modified")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        # dict subclasses otherwise unpickle through __setitem__.
+        return (Style, (dict(self),))
+
+class StyleRegistry:
+    def __init__(self, config, digest=None):
+        self.digest = digest
+        self.categories = dict(config['categories']) # {slug: display name}
+        self.styles = {}
+        for style_id, fields in config['styles'].items():
+            missing = [field for field in STYLE_FIELDS if field not in fields]
+            if missing: raise ValueError(f"style '{style_id}' is missing {', '.join(missing)}")
+            if fields['category'] not in self.categories:
+                raise ValueError(f"style '{style_id}' uses unknown category '{fields['category']}'")
+            self.styles[style_id] = Style(fields, id=style_id)
+        self.default = self.styles[config['default']]
+        self.matcher, self.priorities, self.rule_styles = self.compile(config['rules'])
+
+    def compile(self, rules):
+        """One lookahead per keyword, tagged with its rule's priority; the field guard keeps title keywords out of the filename and vice versa."""
+        alternatives, priorities, rule_styles, seen = [], {}, [], set()
+        for priority, rule in enumerate(rules):
+            style = self.styles.get(rule['style'])
+            if style is None: raise ValueError(f"rule {priority} uses unknown style '{rule['style']}'")
+            rule_styles.append(style)
+            for field in MATCH_FIELDS:
+                for keyword in rule.get(field, []):
+                    keyword = keyword.lower() if field == 'title' else keyword
+                    # An earlier rule already claims this keyword.
+                    if (field, keyword) in seen: continue
+                    seen.add((field, keyword))
+                    guard = r'(?=[^\n]*\n)' if field == 'title' else r'(?![^\n]*\n)'
+                    group = f"k{len(alternatives)}"
+                    priorities[group] = priority
+                    alternatives.append(f"(?P<{group}>{re.escape(keyword)}){guard}")
+        # At each position the alternation picks the earliest rule, so the minimum over all hits is the overall winner.
+        matcher = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+        return matcher, priorities, rule_styles
+
+    def classify(self, title, filename=""):
+        if self.matcher is None: return self.default
+        key = title.lower().replace('\n', ' ') + '\n' + filename
+        best = None
+        for match in self.matcher.finditer(key):
+            priority = self.priorities[match.lastgroup]
+            if best is None or priority < best:
+                best = priority
+                if best == 0: break
+        return self.default if best is None else self.rule_styles[best]
+
+    def category_name(self, slug):
+        return self.categories.get(slug, slug)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        return cls(json.loads(raw.decode('utf-8')), hashlib.sha256(raw).hexdigest())
@@ -0,0 +1,52 @@
+"""Build-time Tailwind CSS for build.py.
+
+The site's pages used to load the Tailwind Play CDN, which compiles CSS in the
+visitor's browser. Here the Tailwind v3 CLI compiles one static stylesheet
+from the class candidates the builder collects instead: class attributes of
+the source pages, quoted strings in their inline scripts, and every quoted
+string in the builder's templates and styles.json (card markup, the SPA
+script, per-style badge colors).
+
+The CLI is pinned in package.json, so `npm install` before the build (which
+the deploy does) provides it in node_modules/.bin; one on PATH works too.
+Without it, pages keep the CDN script.
+"""
+import os
+import re
+import json
+import shutil
+import tempfile
+import subprocess
+
+INPUT_CSS = "@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+STRING_RE = re.compile(r'"([^"\n]*)"|\'([^\'\n]*)\'')
+# Anything with template syntax or markup in it cannot be a class name.
+CANDIDATE_RE = re.compile(r'[^\s{}$<>=;"`]{1,100}')
+
+def split_candidates(values):
+    return {token for value in values if value for token in value.split() if CANDIDATE_RE.fullmatch(token)}
+
+def source_candidates(text):
+    return split_candidates(a or b for a, b in STRING_RE.findall(text))
+
+def find_cli(root_dir):
+    local = os.path.join(root_dir, 'node_modules', '.bin', 'tailwindcss')
+    return local if os.path.exists(local) else shutil.which('tailwindcss')
+
+def compile_css(cli, candidates, config_js):
+    """Run the CLI over `candidates` with the page config (a `tailwind.config = {...}` script). Returns minified CSS bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, 'candidates.txt')
+        with open(content, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(sorted(candidates)))
+        config = os.path.join(tmp, 'tailwind.config.js')
+        with open(config, 'w', encoding='utf-8') as f:
+            # Reuse the exact config the CDN pages run, with the candidate list as content.
+            f.write(f"const tailwind = {{}};\n{config_js}\nmodule.exports = {{...tailwind.config, content: [{json.dumps(content)}]}};\n")
+        source = os.path.join(tmp, 'input.css')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(INPUT_CSS)
+        output = os.path.join(tmp, 'output.css')
+        subprocess.run([cli, '-c', config, '-i', source, '-o', output, '--minify'], check=True, capture_output=True)
+        with open(output, 'rb') as f:
+            return f.read()
@@ -0,0 +1,47 @@
+"""Self-hosted fonts must not displace a post's own <style> on rebuilds."""
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+import fonts
+
+IGNORE = ('.git', '.build', '__pycache__', 'node_modules', '.pytest_cache', 'dist')
+POST = os.path.join('blog', 'claude-3-5-sonnet-review.html')
+
+def write_font(path):
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    pen = TTGlyphPen(None)
+    pen.moveTo((0, 0)); pen.lineTo((0, 500)); pen.lineTo((400, 500)); pen.lineTo((400, 0)); pen.closePath()
+    glyphs = {'.notdef': pen.glyph(), 'A': pen.glyph()}
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(list(glyphs))
+    builder.setupCharacterMap({ord('A'): 'A'})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (500, 0) for name in glyphs})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': 'Inter', 'styleName': 'Regular'})
+    builder.setupOS2()
+    builder.setupPost()
+    builder.save(path)
+
+@pytest.mark.skipif(not fonts.available, reason="fontTools not installed")
+def test_rebuild_keeps_post_style(tmp_path):
+    site = tmp_path / 'site'
+    shutil.copytree(ROOT_DIR, site, ignore=shutil.ignore_patterns(*IGNORE))
+    os.makedirs(site / 'fonts', exist_ok=True)
+    write_font(str(site / 'fonts' / 'Inter-Regular.ttf'))
+    with open(site / POST, encoding='utf-8') as f:
+        rules = f.read().count('prose h2')
+    assert rules
+    for args in ([], ['--full']):
+        subprocess.run([sys.executable, 'build.py', *args], cwd=site, check=True, capture_output=True)
+        with open(site / POST, encoding='utf-8') as f:
+            page = f.read()
+        assert 'data-fonts' in page
+        assert page.count('prose h2') == rules
@@ -0,0 +1,23 @@
+"""--minify writes a minified deploy copy and leaves the source pages alone."""
+import os
+import sys
+import shutil
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from test_parsing import IGNORE, site_files
+
+def test_minify_leaves_sources_alone(tmp_path):
+    site = tmp_path / 'site'
+    shutil.copytree(ROOT_DIR, site, ignore=shutil.ignore_patterns(*IGNORE))
+    build = lambda *args: subprocess.run([sys.executable, 'build.py', *args], cwd=site, check=True, capture_output=True)
+    build()
+    pretty = site_files(site)
+    build('--minify')
+    assert site_files(site) == pretty
+    post = os.path.join('blog', 'what-is-claude.html')
+    with open(site / 'dist' / post, 'rb') as f:
+        minified = f.read()
+    assert b'<!--' in pretty[post] and b'<!--' not in minified
+    assert len(minified) < len(pretty[post])
@@ -0,0 +1,45 @@
+"""Every parser backend must build the site into identical files."""
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+import parsing
+
+# Build state and caches, not outputs.
+IGNORE = ('.git', '.build', '__pycache__', 'node_modules', '.pytest_cache', 'dist')
+
+def build_site(tmp_path, parser):
+    site = tmp_path / parser
+    shutil.copytree(ROOT_DIR, site, ignore=shutil.ignore_patterns(*IGNORE))
+    subprocess.run([sys.executable, 'build.py', '--parser', parser], cwd=site, check=True, capture_output=True)
+    return site
+
+def site_files(site):
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(site):
+        dirnames[:] = [d for d in dirnames if d not in IGNORE]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as f:
+                files[os.path.relpath(path, site)] = f.read()
+    return files
+
+@pytest.mark.skipif(len(parsing.available_parsers()) < 2, reason="only one parser backend installed")
+def test_backends_build_identical_sites(tmp_path):
+    reference, *others = parsing.available_parsers()
+    expected = site_files(build_site(tmp_path, reference))
+    for parser in others:
+        actual = site_files(build_site(tmp_path, parser))
+        assert sorted(actual) == sorted(expected)
+        differing = [path for path in expected if actual[path] != expected[path]]
+        assert not differing, f"{parser} output differs from {reference}: {differing}"
+
+def test_parse_html_drops_whitespace_after_doctype():
+    markup = "<!DOCTYPE html>\n<html><head></head><body><p>x</p></body></html>\n"
+    for parser in parsing.available_parsers():
+        assert str(parsing.parse_html(markup, parser)) == markup